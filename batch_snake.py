@@ -0,0 +1,264 @@
+import numpy as np
+import nav
+from nav import Dmn
+import move_algo
+from move_algo import Algo
+import hamilton_cycle_generator as hcg
+from hamilton_cycle_generator import MstAlgo
+import snake
+
+
+SERIAL_FRACTION = 0.5
+'''
+fraction of the batch, which run_batch_test finishes one by one by default
+'''
+
+
+def find_next_shortcut_nodes(heads, tails, lengths, foods, orders, occupied, neighbors, rows=None):
+    '''
+    find the next node of every game in the batch with move_algo.find_next_shortcut_dirs
+
+    Parameters
+    ----------
+    heads : array
+        head node id of every game
+
+    tails : array
+        tail node id of every game
+
+    lengths : array
+        snake length of every game
+
+    foods : array
+        food node id of every game
+
+    orders : array
+        (G, N) array of the hamiltonian paths of the games
+
+    occupied : array
+        (G, N) boolean array of the nodes occupied by the snakes
+
+    neighbors : array
+        (N, 4) neighbor table of nav.GridTopology
+
+    rows : array, optional
+        row of every game in orders and occupied, by default is None, which is one row per game in order
+
+    Returns
+    -------
+    next_nodes : array
+        the node id every snake should move to next.
+        -1 if the snake has nowhere to go
+    '''
+    dirs = move_algo.find_next_shortcut_dirs(heads, tails, lengths, foods, orders, occupied, neighbors, rows)
+    return np.where(dirs >= 0, neighbors[heads, np.maximum(dirs, 0)], -1)
+
+
+def create_batch_food(occupied, seeds):
+    '''
+    create a food for every game in the batch, the same way snake.create_food does.
+    Used in the compatibility mode, which reproduces the saved simulations
+
+    Parameters
+    ----------
+    occupied : array
+        (G, N) boolean array of the nodes occupied by the snakes
+
+    seeds : array
+        rng seed of every game
+
+    Returns
+    -------
+    foods : array
+        node id of the new food of every game. -1 if there are no free nodes
+    '''
+    free = ~occupied
+    free_counts = free.sum(axis=1)
+    foods = np.full(shape=len(seeds), fill_value=-1, dtype=np.int64)
+    has_free = free_counts > 0
+    indices = np.array([snake.get_food_index(seed, count) for seed, count in zip(seeds[has_free], free_counts[has_free])],
+                       dtype=np.int64)
+    # the food is the free node, whose running count of free nodes passes the index
+    foods[has_free] = np.argmax(np.cumsum(free[has_free], axis=1) > indices[:, None], axis=1)
+    return foods
+
+
+def spawn_batch_food(free_pools, free_counts, rngs):
+    '''
+    spawn a food for every game in the batch, the same way snake.spawn_food does
+
+    Parameters
+    ----------
+    free_pools : array
+        (G, N) array of the free node pools of the games
+
+    free_counts : array
+        number of free nodes of every game
+
+    rngs : list
+        random generator of every game
+
+    Returns
+    -------
+    foods : array
+        node id of the new food of every game. -1 if there are no free nodes
+    '''
+    foods = np.full(shape=len(rngs), fill_value=-1, dtype=np.int64)
+    for i in range(len(rngs)):
+        if free_counts[i] > 0:
+            foods[i] = free_pools[i, rngs[i].integers(free_counts[i])]
+    return foods
+
+
+def run_batch_test(node_shape, algo, seeds, is_legacy_food=False, mst_algo=MstAlgo.PRIM, serial_count=None):
+    '''
+    run a batch of games in lockstep. Every game produces the same moves
+    as snake.run_test would for its seed.
+
+    Parameters
+    ----------
+    node_shape : array
+        node shape HxW - number of nodes in the height and width dimensions
+
+    algo : Algo
+        algorithm to be tested
+
+    seeds : array
+        rng seed of every game in the batch
+
+    is_legacy_food : bool, optional
+        whether to create the food the same way as snake.create_food, by default is False
+
+    mst_algo : MstAlgo, optional
+        spanning tree algorithm, which guides the hamiltonian paths, by default is MstAlgo.PRIM
+
+    serial_count : integer, optional
+        number of running games, at which the rest of them are finished one by one by snake.play_game,
+        by default is None, which is SERIAL_FRACTION of the batch.
+        The lockstep ticks cost the same for a few games as for many, so the last games,
+        which are usually the longest, are faster with the fast-forward of snake.play_game
+
+    Returns
+    -------
+    all_moves : array
+        (G, N - 1) array, where every row are the moves of the game as returned by snake.run_test
+    '''
+    node_shape = nav.create_pos(node_shape[Dmn.H], node_shape[Dmn.W])
+    seeds = np.asarray(seeds, dtype=np.int64)
+    game_count = len(seeds)
+    size = np.int64(node_shape[Dmn.W] * node_shape[Dmn.H])
+    neighbors = nav.get_topology(node_shape).m_neighbors
+
+    # Hamiltonian path (node id -> path order) and the next node in the path of every game
+    tables = {seed: hcg.get_path_tables(node_shape, seed, mst_algo) for seed in np.unique(seeds)}
+    orders = np.array([tables[seed].m_orders for seed in seeds], dtype=np.int64)
+    successors = np.array([tables[seed].m_successors for seed in seeds], dtype=np.int64)
+
+    # The snake bodies are ring buffers. The head is at head_ptr and the body follows it.
+    bodies = np.zeros(shape=(game_count, size), dtype=np.int64)
+    head_ptrs = np.zeros(shape=game_count, dtype=np.int64)
+    lengths = np.ones(shape=game_count, dtype=np.int64)
+    occupied = np.zeros(shape=(game_count, size), dtype=bool)
+    # The free nodes are pools with position indices, the same as in snake.SnakeBody
+    free_pools = np.tile(np.arange(size, dtype=np.int64), (game_count, 1))
+    free_indices = free_pools.copy()
+    rows = np.arange(game_count)
+
+    rngs = [np.random.default_rng(np.random.SeedSequence(entropy=seed)) for seed in seeds]
+    heads = np.array([rng.integers(size, size=1, dtype=int)[0] for rng in rngs], dtype=np.int64)
+    bodies[:, 0] = heads
+    occupied[rows, heads] = True
+    last_free = free_pools[:, size - 1]
+    free_pools[rows, free_indices[rows, heads]] = last_free
+    free_indices[rows, last_free] = free_indices[rows, heads]
+    if is_legacy_food:
+        foods = create_batch_food(occupied, seeds)
+    else:
+        foods = spawn_batch_food(free_pools, size - lengths, rngs)
+
+    all_moves = np.zeros(shape=(game_count, size - 1), dtype=np.int64)
+    curr_moves = np.zeros(shape=game_count, dtype=np.int64)
+    active = np.ones(shape=game_count, dtype=bool)
+
+    # The games, which are still running. The per-game tables are indexed in place through it,
+    # and it's only compacted in the ticks, in which some games finish
+    games = np.arange(game_count)
+    if serial_count is None:
+        serial_count = int(game_count * SERIAL_FRACTION)
+    while len(games) > serial_count:
+        game_heads = head_ptrs[games]
+        game_lengths = lengths[games]
+        heads = bodies[games, game_heads]
+        tails = bodies[games, (game_heads + game_lengths - 1) % size]
+
+        if algo is Algo.FOLLOW_PATH:
+            next_nodes = successors[games, heads]
+        else:
+            next_nodes = find_next_shortcut_nodes(heads, tails, game_lengths, foods[games],
+                                                  orders, occupied, neighbors, rows=games)
+
+        # Games, in which the snake has nowhere to go, stop without making a move
+        is_stuck = next_nodes < 0
+        if is_stuck.any():
+            active[games[is_stuck]] = False
+            games = games[~is_stuck]
+            next_nodes = next_nodes[~is_stuck]
+            tails = tails[~is_stuck]
+
+        all_moves[games, curr_moves[games]] += 1
+
+        is_eating = next_nodes == foods[games]
+        is_lost = ~is_eating & occupied[games, next_nodes]
+        if is_lost.any():
+            active[games[is_lost]] = False
+
+        # Move the snakes, which didn't eat, by removing their tails.
+        # The removed tail takes the place of the new head in the free pool
+        is_moving = ~is_eating & ~is_lost
+        moving = games[is_moving]
+        moving_tails = tails[is_moving]
+        moving_heads = next_nodes[is_moving]
+        occupied[moving, moving_tails] = False
+        moving_indices = free_indices[moving, moving_heads]
+        free_pools[moving, moving_indices] = moving_tails
+        free_indices[moving, moving_tails] = moving_indices
+
+        # Swap-remove the heads of the snakes, which ate, from the free pool
+        eaters = games[is_eating]
+        eaten = next_nodes[is_eating]
+        last_free = free_pools[eaters, size - lengths[eaters] - 1]
+        eaten_indices = free_indices[eaters, eaten]
+        free_pools[eaters, eaten_indices] = last_free
+        free_indices[eaters, last_free] = eaten_indices
+
+        # Push the new heads
+        is_pushed = is_eating | is_moving
+        pushed = games[is_pushed]
+        head_ptrs[pushed] = (head_ptrs[pushed] - 1) % size
+        bodies[pushed, head_ptrs[pushed]] = next_nodes[is_pushed]
+        occupied[pushed, next_nodes[is_pushed]] = True
+
+        if len(eaters) > 0:
+            lengths[eaters] += 1
+            if is_legacy_food:
+                foods[eaters] = create_batch_food(occupied[eaters], seeds[eaters])
+            else:
+                foods[eaters] = spawn_batch_food(free_pools[eaters], size - lengths[eaters],
+                                                 [rngs[eater] for eater in eaters])
+            is_won = foods[eaters] == -1
+            active[eaters[is_won]] = False
+            curr_moves[eaters[~is_won]] += 1
+
+        if is_lost.any() or (len(eaters) > 0 and is_won.any()):
+            games = games[active[games]]
+
+    # Finish the remaining games from their current state. The ring buffers and the free pools
+    # have the layout of snake.SnakeBody, so the food keeps spawning at the same nodes
+    all_nodes = np.arange(size)
+    for game in games:
+        snake_body = snake.SnakeBody(size)
+        snake_body.load_state(bodies[game], head_ptrs[game], lengths[game], free_pools[game], free_indices[game])
+        rng = None if is_legacy_food else rngs[game]
+        snake.play_game(snake_body, foods[game], algo, tables[seeds[game]], all_nodes, seeds[game], node_shape, rng,
+                        all_moves[game], curr_moves[game])
+    return all_moves
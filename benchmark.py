@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+
+import time
+import numpy as np
+import nav
+from nav import Dmn
+import hamilton_cycle_generator as hcg
+from hamilton_cycle_generator import MstAlgo
+from move_algo import Algo
+import batch_snake
+
+
+def measure(func, repeat=1):
+    '''
+    measure the best execution time of a function
+
+    Parameters
+    ----------
+    func : function
+        function to be measured
+
+    repeat : integer, optional
+        number of times to run the function, by default is 1
+
+    Returns
+    -------
+    (seconds, result) : tuple
+        the best execution time in seconds and the result of the last run
+    '''
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def benchmark_hamilton_cycle(shapes=((16, 16), (64, 64), (128, 128), (256, 256)), seed=0, repeat=3):
+    '''
+    compare the walker in generate_hamilton_cycle to generate_hamilton_cycle_vectorized
+
+    Parameters
+    ----------
+    shapes : tuple, optional
+        node shapes HxW to be benchmarked, by default are 16x16, 64x64, 128x128 and 256x256
+
+    seed : integer, optional
+        used to seed the default rng, by default is 0
+
+    repeat : integer, optional
+        number of runs for each shape, the best time is reported, by default is 3
+    '''
+    print(f'{"shape":>12} {"walker [s]":>12} {"vectorized [s]":>15} {"speedup":>9}')
+    for shape in shapes:
+        shape = nav.create_pos(shape[Dmn.H], shape[Dmn.W])
+        mst, _ = hcg.generate_prim_mst(shape, seed)
+        walker_time, walker_cycle = measure(lambda: hcg.generate_hamilton_cycle(mst, shape), repeat)
+        vectorized_time, vectorized_cycle = measure(lambda: hcg.generate_hamilton_cycle_vectorized(mst, shape), repeat)
+        if not np.array_equal(walker_cycle, vectorized_cycle):
+            raise ValueError(f'benchmark failed! the cycles for shape: {shape} are different!')
+        print(f'{f"{shape[Dmn.H]}x{shape[Dmn.W]}":>12} {walker_time:>12.4f} {vectorized_time:>15.4f} '
+              f'{walker_time / vectorized_time:>8.1f}x')
+
+
+def benchmark_mst_algos(shape=(64, 64), game_shape=(16, 16), seed_count=20):
+    '''
+    compare the spanning tree algorithms by their throughput and the TAKE_SHORTCUTS moves of the resulting paths
+
+    Parameters
+    ----------
+    shape : array, optional
+        node shape HxW, for which the throughput is measured, by default is 64x64
+
+    game_shape : array, optional
+        node shape HxW of the games, played with Algo.TAKE_SHORTCUTS, by default is 16x16
+
+    seed_count : integer, optional
+        number of seeds, which are measured and played, by default is 20
+    '''
+    shape = nav.create_pos(shape[Dmn.H], shape[Dmn.W])
+    game_shape = nav.create_pos(game_shape[Dmn.H], game_shape[Dmn.W])
+    seeds = np.arange(seed_count)
+    print(f'{"mst_algo":>10} {"paths/s":>10} {"mean moves":>12} {"std moves":>11}')
+    for mst_algo in MstAlgo:
+        elapsed, _ = measure(lambda: [hcg.generate_path(shape, seed, mst_algo=mst_algo) for seed in seeds])
+        all_moves = batch_snake.run_batch_test(game_shape, Algo.TAKE_SHORTCUTS, seeds, mst_algo=mst_algo)
+        total_moves = all_moves.sum(axis=1)
+        print(f'{mst_algo.name:>10} {seed_count / elapsed:>10.1f} {total_moves.mean():>12.1f} {total_moves.std():>11.1f}')
+
+
+def main():
+    ''' Main function '''
+    benchmark_hamilton_cycle()
+    benchmark_mst_algos()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,38 @@
 import numpy as np
+import os
+import hashlib
+import tempfile
 import arcade
+from arcade.gl import geometry
+from enum import IntEnum
+from functools import lru_cache
+from PIL import Image, ImageDraw, ImageFont
 import nav
 from nav import Dir, Axis, Dmn
 
 
+class RenderMode(IntEnum):
+    ''' Enumerate the backends, which draw the snake and the food '''
+    SHAPES = 0
+    ''' shape element lists, rebuilt in chunks '''
+    SPRITES = 1
+    ''' a sprite list with pre-drawn segment textures '''
+    RASTER = 2
+    ''' an image of the grid with a pixel per node, uploaded as a single texture '''
+
+
+class SegmentKind(IntEnum):
+    ''' Enumerate the kinds of drawn segments '''
+    HEAD = 0
+    ''' snake head '''
+    BODY = 1
+    ''' snake body segment '''
+    TAIL = 2
+    ''' snake tail '''
+    FOOD = 3
+    ''' food '''
+
+
 def offset_coord(t, node_size):
     '''
     offset draw coordinate
@@ -74,7 +103,7 @@ def get_coords(node_id, node_size, shape_w, height):
     y = height - offset_coord(node_id / shape_w, node_size)
     return (x, y)
 
-def create_snake_head(coords, dir: Dir, node_size, color):
+def create_snake_head(coords, dir, node_size, color):
     '''
     create a snake head shape
 
@@ -83,8 +112,8 @@ def create_snake_head(coords, dir: Dir, node_size, color):
     coords : list
         [x, y] coordinates of the triangle to be drawn
 
-    dir : Dir
-        direction which the triangle is facing
+    dir : Dir or integer
+        direction or direction code which the triangle is facing
 
     node_size : integer
         width and height of a node in pixels
@@ -99,24 +128,48 @@ def create_snake_head(coords, dir: Dir, node_size, color):
     Raises
     ------
     TypeError
-        if dir isn't of type Dir
+        if dir isn't a Dir or a direction code
     '''
-    if not isinstance(dir, Dir):
-        raise TypeError("dir: {dir} isn't of type Dir")
-    half = node_size * 0.5
-    quart = node_size * 0.25
-    dir_offsets = {
-        Dir.Up: ((-quart, -half), (0, half), (quart, -half)),
-        Dir.Down : ((-quart, half), (0, -half), (quart, half)),
-        Dir.Left: ((half, -quart), (-half, 0), (half, quart)),
-        Dir.Right: ((-half, -quart), (half, 0), (-half, quart)),
-    }
-    offsets = dir_offsets.get(dir)
+    offsets = get_snake_head_offsets(dir, node_size)
     point_list = create_point_list(coords, offsets)
     color_list = [color] * len(point_list)
     snake_head = arcade.create_triangles_filled_with_colors(point_list, color_list)
     return snake_head
 
+def get_snake_head_offsets(dir, node_size):
+    '''
+    get the corners of the snake head triangle
+
+    Parameters
+    ----------
+    dir : Dir or integer
+        direction or direction code which the triangle is facing
+
+    node_size : integer
+        width and height of a node in pixels
+
+    Returns
+    -------
+    offsets : tuple
+        (x, y) offsets of the corners from the center of the node
+
+    Raises
+    ------
+    TypeError
+        if dir isn't a Dir or a direction code
+    '''
+    dir = nav.to_dir_code(dir)
+    half = node_size * 0.5
+    quart = node_size * 0.25
+    # The offsets of every direction, in the order of the direction codes: Up, Right, Down, Left
+    dir_offsets = (
+        ((-quart, -half), (0, half), (quart, -half)),
+        ((-half, -quart), (half, 0), (-half, quart)),
+        ((-quart, half), (0, -half), (quart, half)),
+        ((half, -quart), (-half, 0), (half, quart)),
+    )
+    return dir_offsets[dir]
+
 def create_food(node_id, node_size, shape_w, height, color = arcade.color.RED_VIOLET):
     '''
     create a food shape
@@ -147,7 +200,7 @@ def create_food(node_id, node_size, shape_w, height, color = arcade.color.RED_VI
     food = arcade.create_ellipse_filled(coords[Axis.X], coords[Axis.Y], node_size, node_size, color)
     return food
 
-def create_snake_body_segment(coords, prev_dir: Dir, next_dir: Dir, node_size, color):
+def create_snake_body_segment(coords, prev_dir, next_dir, node_size, color):
     '''
     create a snake body segment shape
 
@@ -156,11 +209,11 @@ def create_snake_body_segment(coords, prev_dir: Dir, next_dir: Dir, node_size, c
     coords : list
         [x, y] center coordinates
 
-    prev_dir : Dir
-        previous direction of the line segment
+    prev_dir : Dir or integer
+        previous direction or direction code of the line segment
 
-    next_dir : Dir
-        next direction of the line segment
+    next_dir : Dir or integer
+        next direction or direction code of the line segment
 
     node_size : integer
         width and height of a node in pixels
@@ -176,14 +229,15 @@ def create_snake_body_segment(coords, prev_dir: Dir, next_dir: Dir, node_size, c
     Raises
     ------
     TypeError
-        if prev_dir or next_dir aren't of type Dir
+        if prev_dir or next_dir aren't a Dir or a direction code
     '''
-    if not isinstance(prev_dir, Dir) or not isinstance(next_dir, Dir):
-        raise TypeError("prev_dir: {prev_dir} or next_dir: {next_dir} are not of type Dir")
-    def get_coords(dir: Dir):
+    prev_dir = nav.to_dir_code(prev_dir)
+    next_dir = nav.to_dir_code(next_dir)
+    def get_coords(dir):
         half = node_size * 0.5
-        offsets = { Dir.Up : [0, half], Dir.Down : [0, -half], Dir.Left: [-half, 0], Dir.Right: [half, 0] }
-        offset = offsets.get(dir, [0, 0])
+        # The offsets in the order of the direction codes: Up, Right, Down, Left
+        offsets = ([0, half], [half, 0], [0, -half], [-half, 0])
+        offset = offsets[dir]
         new_coords = [sum(x) for x in zip(coords, offset)]
         return new_coords
     prev_coords = get_coords(prev_dir)
@@ -195,7 +249,7 @@ def create_snake_body_segment(coords, prev_dir: Dir, next_dir: Dir, node_size, c
     body_segment = arcade.create_line_strip(points_list, color, node_size * 0.5)
     return body_segment
 
-def create_snake_tail(coords, dir: Dir, node_size, color):
+def create_snake_tail(coords, dir, node_size, color):
     '''
     create a snake tail shape
 
@@ -204,8 +258,8 @@ def create_snake_tail(coords, dir: Dir, node_size, color):
     coords : list
         [x, y] center coordinates
 
-    dir : Dir
-        direction which the tail is facing
+    dir : Dir or integer
+        direction or direction code which the tail is facing
 
     node_size : integer
         with and height of a node in pixels
@@ -221,19 +275,9 @@ def create_snake_tail(coords, dir: Dir, node_size, color):
     Raises
     ------
     TypeError
-        if dir isn't of type Dir
+        if dir isn't a Dir or a direction code
     '''
-    if not isinstance(dir, Dir):
-        raise TypeError("dir: {dir} isn't of type Dir")
-    half = node_size * 0.5
-    quart = node_size * 0.25
-    dir_offsets = {
-        Dir.Up: ((-quart, half), (-quart, -half,), (0, 0), (quart, -half), (quart, half)),
-        Dir.Down: ((-quart, -half), (-quart, half), (0, 0), (quart, half), (quart, -half)),
-        Dir.Left: ((-half, quart), (half, quart), (0, 0), (half, -quart), (-half, -quart)),
-        Dir.Right: ((half, quart), (-half, quart), (0, 0), (-half, -quart), (half, -quart))
-    }
-    offsets = dir_offsets.get(dir)
+    offsets = get_snake_tail_offsets(dir, node_size)
     point_list = create_point_list(coords, offsets)
     tail = arcade.create_polygon(point_list, color)
     tr = arcade.create_triangles_filled_with_colors((point_list[1], point_list[2], point_list[3]),
@@ -241,19 +285,54 @@ def create_snake_tail(coords, dir: Dir, node_size, color):
     tail_segments = [tail, tr]
     return [tail, tr]
 
+def get_snake_tail_offsets(dir, node_size):
+    '''
+    get the corners of the snake tail polygon. Corners 1, 2 and 3
+    are the notch, which is drawn in black over the polygon
+
+    Parameters
+    ----------
+    dir : Dir or integer
+        direction or direction code which the tail is facing
+
+    node_size : integer
+        width and height of a node in pixels
 
-def create_snake_list(snake_arr, snake_head_dir : Dir, node_size, node_shape, screen_height,
+    Returns
+    -------
+    offsets : tuple
+        (x, y) offsets of the corners from the center of the node
+
+    Raises
+    ------
+    TypeError
+        if dir isn't a Dir or a direction code
+    '''
+    dir = nav.to_dir_code(dir)
+    half = node_size * 0.5
+    quart = node_size * 0.25
+    # The offsets of every direction, in the order of the direction codes: Up, Right, Down, Left
+    dir_offsets = (
+        ((-quart, half), (-quart, -half,), (0, 0), (quart, -half), (quart, half)),
+        ((half, quart), (-half, quart), (0, 0), (-half, -quart), (half, -quart)),
+        ((-quart, -half), (-quart, half), (0, 0), (quart, half), (quart, -half)),
+        ((-half, quart), (half, quart), (0, 0), (half, -quart), (-half, -quart)),
+    )
+    return dir_offsets[dir]
+
+
+def create_snake_list(snake_arr, snake_head_dir, node_size, node_shape, screen_height,
                       offset = None):
     '''
     create a snake shape element list
 
     Parameters
     ----------
-    snake_arr : array
-        array of node ids occupied by the snake
+    snake_arr : SnakeBody or array
+        node ids occupied by the snake, starting from the head
 
-    snake_head_dir : Dir
-        direction the snake head is pointing to
+    snake_head_dir : Dir or integer
+        direction or direction code the snake head is pointing to
 
     node_size : integer
         with and height of a node in pixels
@@ -275,34 +354,102 @@ def create_snake_list(snake_arr, snake_head_dir : Dir, node_size, node_shape, sc
     Raises
     ------
     TypeError
-        if snake_head_dir isn't of type Dir
+        if snake_head_dir isn't a Dir or a direction code
     '''
-    if not isinstance(snake_head_dir, Dir):
-        raise TypeError("snake_head_dir: {snake_head_dir} isn't of type Dir")
+    snake_head_dir = nav.to_dir_code(snake_head_dir)
     snake_list = arcade.ShapeElementList()
     snake_len = len(snake_arr)
     for i in range(snake_len):
         j = snake_len - 1 - i
-        square = snake_arr[j]
-        coords = get_coords(square, node_size, node_shape[Dmn.W], screen_height)
-
-        color = arcade.color.ALIZARIN_CRIMSON if j == 0 else arcade.color.UFO_GREEN
-        segments = []
-        if j == 0:
-            segments = [create_snake_head(coords, snake_head_dir, node_size, color)]
-        elif j == snake_len -1:
-            dir = nav.get_dir_between(square, snake_arr[j-1], node_shape)
-            segments = create_snake_tail(coords, dir, node_size, color)
-        else:
-            prev_dir = nav.get_dir_between(square, snake_arr[j-1], node_shape)
-            next_dir = nav.get_dir_between(square, snake_arr[j+1], node_shape)
-            segments = [create_snake_body_segment(coords, prev_dir, next_dir, node_size, color)]
+        segments = create_snake_segment(snake_arr, j, snake_head_dir, node_size, node_shape, screen_height)
         for segment in segments:
             snake_list.append(segment)
     if offset is not None:
         snake_list.move(offset[Axis.X], offset[Axis.Y])
     return snake_list
 
+def create_snake_segment(snake_arr, index, snake_head_dir, node_size, node_shape, screen_height):
+    '''
+    create the shapes of a single snake segment. The shapes depend only on the
+    segment and its neighbors, so a segment can be redrawn without the rest of the snake
+
+    Parameters
+    ----------
+    snake_arr : SnakeBody or array
+        node ids occupied by the snake, starting from the head
+
+    index : integer
+        index of the segment in the snake, 0 is the head
+
+    snake_head_dir : Dir or integer
+        direction or direction code the snake head is pointing to
+
+    node_size : integer
+        width and height of a node in pixels
+
+    node_shape : array
+        node shape HxW - number of nodes in the height and width dimensions
+
+    screen_height : integer
+        the height of the screen in pixels
+
+    Returns
+    -------
+    segments : list of Shape objects
+        the shapes of the segment
+
+    Raises
+    ------
+    TypeError
+        if snake_head_dir isn't a Dir or a direction code
+    '''
+    key = get_segment_key(snake_arr, index, snake_head_dir, node_shape)
+    coords = get_coords(snake_arr[index], node_size, node_shape[Dmn.W], screen_height)
+    if key[0] == SegmentKind.HEAD:
+        return [create_snake_head(coords, key[1], node_size, arcade.color.ALIZARIN_CRIMSON)]
+    if key[0] == SegmentKind.TAIL:
+        return create_snake_tail(coords, key[1], node_size, arcade.color.UFO_GREEN)
+    return [create_snake_body_segment(coords, key[1], key[2], node_size, arcade.color.UFO_GREEN)]
+
+def get_segment_key(snake_arr, index, snake_head_dir, node_shape):
+    '''
+    get the variant of a snake segment. There are only a few variants,
+    so every one of them can be drawn in advance
+
+    Parameters
+    ----------
+    snake_arr : SnakeBody or array
+        node ids occupied by the snake, starting from the head
+
+    index : integer
+        index of the segment in the snake, 0 is the head
+
+    snake_head_dir : Dir or integer
+        direction or direction code the snake head is pointing to
+
+    node_shape : array
+        node shape HxW - number of nodes in the height and width dimensions
+
+    Returns
+    -------
+    key : tuple
+        (SegmentKind.HEAD, head direction code), (SegmentKind.TAIL, direction code to the previous segment)
+        or (SegmentKind.BODY, direction code to the previous segment, direction code to the next segment)
+
+    Raises
+    ------
+    TypeError
+        if snake_head_dir isn't a Dir or a direction code
+    '''
+    if index == 0:
+        return (SegmentKind.HEAD, nav.to_dir_code(snake_head_dir))
+    square = snake_arr[index]
+    prev_dir = nav.to_dir_code(nav.get_dir_between(square, snake_arr[index - 1], node_shape))
+    if index == len(snake_arr) - 1:
+        return (SegmentKind.TAIL, prev_dir)
+    next_dir = nav.to_dir_code(nav.get_dir_between(square, snake_arr[index + 1], node_shape))
+    return (SegmentKind.BODY, prev_dir, next_dir)
+
 def create_path_lists(path, node_size, node_shape, screen_width, screen_height,
                       offset = None,
                       color = arcade.color.WHITE, font_size = None,
@@ -316,7 +463,7 @@ def create_path_lists(path, node_size, node_shape, screen_width, screen_height,
         array of node ids that compromise the path
 
     node_size : integer
-        with and height of a node in pixels
+        width and height of a node in pixels
 
     node_shape : array
         node shape HxW - number of nodes in the height and width dimensions
@@ -380,8 +527,8 @@ def create_flat_snake_list(snake_arr, food, path, node_size,
 
     Parameters
     ----------
-    snake_arr : array
-        array of node ids occupied by the snake
+    snake_arr : SnakeBody or array
+        node ids occupied by the snake, starting from the head
 
     snake_head_dir : Dir
         direction the snake head is pointing to
@@ -394,7 +541,7 @@ def create_flat_snake_list(snake_arr, food, path, node_size,
         the indvidual snake segments
 
     node_size : integer
-        with and height of a node in pixels
+        width and height of a node in pixels
 
     node_shape : array
         node shape HxW - number of nodes in the height and width dimensions
@@ -448,7 +595,7 @@ def create_flat_path_lists(path, node_size, node_shape, offset = None,
         array of node ids that compromise the path
 
     node_size : integer
-        with and height of a node in pixels
+        width and height of a node in pixels
 
     node_shape : array
         node shape HxW - number of nodes in the height and width dimensions
@@ -497,4 +644,970 @@ def create_flat_path_lists(path, node_size, node_shape, offset = None,
         path_shape_list.move(offset[Axis.X], offset[Axis.Y])
 
     path_lists = (path_sprite_list, path_shape_list)
-    return path_lists
\ No newline at end of file
+    return path_lists
+
+@lru_cache(maxsize=8)
+def create_glyph_atlas(font_size, color = arcade.color.WHITE):
+    '''
+    rasterize the digit glyphs once, so the labels of the path overlay
+    are composed from them instead of rendering text per node
+
+    Parameters
+    ----------
+    font_size : integer
+        size of the text in points
+
+    color : tuple, optional
+        (r, g, b) color of the text, by default is White
+
+    Returns
+    -------
+    atlas : array
+        (H, W, 4) RGBA image of the digits 0 to 9 side by side
+
+    glyph_starts : array
+        x coordinate of every digit in the atlas, followed by the width of the atlas
+    '''
+    # PIL measures the fonts in pixels, arcade in points at 96 dpi
+    font_px = max(1, round(font_size * 96 / 72))
+    try:
+        font = ImageFont.truetype('arial.ttf', font_px)
+    except OSError:
+        try:
+            font = ImageFont.load_default(font_px)
+        except TypeError:
+            # Before Pillow 10.1 the default font has a fixed size
+            font = ImageFont.load_default()
+    digits = '0123456789'
+    widths = [max(1, round(font.getlength(digit))) for digit in digits]
+    glyph_starts = np.concatenate(([0], np.cumsum(widths)))
+    ascent, descent = font.getmetrics()
+
+    image = Image.new('RGBA', (int(glyph_starts[-1]), ascent + descent), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(image)
+    for digit, x in zip(digits, glyph_starts):
+        draw.text((int(x), 0), digit, font=font, fill=tuple(color[:3]))
+    atlas = np.asarray(image)
+    atlas.flags.writeable = False
+    return atlas, glyph_starts
+
+def create_label_grid_image(labels, node_size, color = arcade.color.WHITE, font_size = None):
+    '''
+    draw a grid with a number in every node into a single image
+
+    Parameters
+    ----------
+    labels : array
+        (H, W) array of non-negative integers, which label the nodes.
+        Row 0 is the top row of the grid
+
+    node_size : integer
+        width and height of a node in pixels
+
+    color : tuple, optional
+        (r, g, b) color of the text and grid, by default is White
+
+    font_size : integer, optional
+        size of the text, by default is node_size // 2
+
+    Returns
+    -------
+    image : Image
+        RGBA image of H * node_size + 1 by W * node_size + 1 pixels
+    '''
+    if font_size is None:
+        font_size = node_size // 2
+    atlas, glyph_starts = create_glyph_atlas(font_size, color)
+    grid_h, grid_w = labels.shape
+    canvas = np.zeros(shape=(grid_h * node_size + 1, grid_w * node_size + 1, 4), dtype=np.uint8)
+    rgba = np.array(tuple(color[:3]) + (255,), dtype=np.uint8)
+    canvas[::node_size, :] = rgba
+    canvas[:, ::node_size] = rgba
+
+    glyph_h = min(atlas.shape[0], node_size - 1)
+    for (row, col), label in np.ndenumerate(labels):
+        glyphs = [atlas[:glyph_h, glyph_starts[digit]:glyph_starts[digit + 1]] for digit in map(int, str(label))]
+        text = np.concatenate(glyphs, axis=1)[:, :node_size - 1]
+        # Center the text in the node, inside the grid lines
+        y = row * node_size + 1 + (node_size - 1 - text.shape[0]) // 2
+        x = col * node_size + 1 + (node_size - 1 - text.shape[1]) // 2
+        region = canvas[y:y + text.shape[0], x:x + text.shape[1]]
+        is_text = text[..., 3] > region[..., 3]
+        region[is_text] = text[is_text]
+    return Image.fromarray(canvas)
+
+def load_overlay_image(labels, node_size, file_name = None, cache_dir = None,
+                       color = arcade.color.WHITE, font_size = None):
+    '''
+    load a label grid image from the on-disk store, creating and saving it if it isn't there
+
+    Parameters
+    ----------
+    labels : array
+        (H, W) array of non-negative integers, which label the nodes
+
+    node_size : integer
+        width and height of a node in pixels
+
+    file_name : string, optional
+        name of the image in the store, by default is None, which disables the store
+
+    cache_dir : string, optional
+        directory of the on-disk store, by default is None, which disables the store
+
+    color : tuple, optional
+        (r, g, b) color of the text and grid, by default is White
+
+    font_size : integer, optional
+        size of the text, by default is node_size // 2
+
+    Returns
+    -------
+    image : Image
+        RGBA image of the label grid
+    '''
+    if file_name is None or cache_dir is None:
+        return create_label_grid_image(labels, node_size, color, font_size)
+
+    file_path = os.path.join(cache_dir, file_name)
+    try:
+        with Image.open(file_path) as image:
+            return image.convert('RGBA')
+    except (OSError, ValueError):
+        pass
+
+    image = create_label_grid_image(labels, node_size, color, font_size)
+    temp_path = None
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        # Write to a unique temporary file first, so other threads and processes never read a partial file
+        file_handle, temp_path = tempfile.mkstemp(suffix='.tmp', dir=cache_dir)
+        with os.fdopen(file_handle, "wb") as outfile:
+            image.save(outfile, 'PNG')
+        os.replace(temp_path, file_path)
+    except OSError:
+        # Failing to store the image only costs creating it again
+        if temp_path is not None:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+    return image
+
+def create_overlay_sprite_list(image, name, offset = None):
+    '''
+    create a sprite list with a single sprite, whose bottom-left corner is at the origin
+
+    Parameters
+    ----------
+    image : Image
+        RGBA image of the sprite
+
+    name : string
+        unique name of the texture
+
+    offset : list, optional
+        [x, y] offset the sprite in the X-Y axis, by default is None
+
+    Returns
+    -------
+    sprite_list : SpriteList
+        the sprite list
+    '''
+    texture = arcade.Texture(name, image, hit_box_algorithm='None')
+    sprite = arcade.Sprite(texture=texture)
+    sprite.center_x = image.width * 0.5
+    sprite.center_y = image.height * 0.5
+    sprite_list = arcade.SpriteList()
+    sprite_list.append(sprite)
+    if offset is not None:
+        sprite_list.move(offset[Axis.X], offset[Axis.Y])
+    return sprite_list
+
+def get_overlay_name(node_size, font_size, color):
+    '''
+    get a name, which identifies the style of a label grid
+
+    Parameters
+    ----------
+    node_size : integer
+        width and height of a node in pixels
+
+    font_size : integer
+        size of the text
+
+    color : tuple
+        (r, g, b) color of the text and grid
+
+    Returns
+    -------
+    string
+        name, used for the texture and the file names of the overlays
+    '''
+    color_name = ''.join(f'{channel:02x}' for channel in color[:3])
+    return f'size_{node_size}_font_{font_size}_{color_name}'
+
+def create_path_overlay_lists(path, node_size, node_shape, seed = None, cache_dir = None,
+                              offset = None, color = arcade.color.WHITE, font_size = None):
+    '''
+    create the path lists as a single labeled grid texture. It replaces create_path_lists,
+    which renders a text sprite per node. The grid is composed from a glyph atlas and,
+    if cache_dir is specified, stored on disk by the shape, a digest of the path and the style,
+    so a path, which was generated differently, never gets a stale overlay
+
+    Parameters
+    ----------
+    path : array
+        array of node ids that compromise the path
+
+    node_size : integer
+        width and height of a node in pixels
+
+    node_shape : array
+        node shape HxW - number of nodes in the height and width dimensions
+
+    seed : integer, optional
+        seed, which generated the path, by default is None.
+        It only makes the file names readable, the digest of the path identifies them
+
+    cache_dir : string, optional
+        directory of the on-disk store, by default is None, which disables the on-disk store
+
+    offset : list, optional
+        [x, y] offset the lists in the X-Y axis, by default is None
+
+    color : tuple, optional
+        (r, g, b) color of the text and grid, by default is White
+
+    font_size : integer, optional
+        size of the text, by default is node_size // 2
+
+    Returns
+    -------
+    path_lists : tuple
+        a tuple of the grid sprite list
+    '''
+    if font_size is None:
+        font_size = node_size // 2
+    labels = np.asarray(path).reshape(node_shape[Dmn.H], node_shape[Dmn.W])
+    # hash() is salted per process, so it can't name files
+    digest = hashlib.sha1(np.ascontiguousarray(labels, dtype=np.int64).tobytes()).hexdigest()[:16]
+    name = f'{digest}_{get_overlay_name(node_size, font_size, color)}'
+    seed_name = '' if seed is None else f'_seed_{seed}'
+    file_name = f'overlay_{node_shape[Dmn.H]}x{node_shape[Dmn.W]}{seed_name}_{name}.png'
+    image = load_overlay_image(labels, node_size, file_name, cache_dir, color, font_size)
+    return (create_overlay_sprite_list(image, f'path_overlay_{name}', offset),)
+
+def create_flat_path_overlay_lists(node_size, node_shape, cache_dir = None, offset = None,
+                                   color = arcade.color.WHITE, font_size = None):
+    '''
+    create the flattened path lists as a single labeled row texture.
+    It replaces create_flat_path_lists, which renders a text sprite per node
+
+    Parameters
+    ----------
+    node_size : integer
+        width and height of a node in pixels
+
+    node_shape : array
+        node shape HxW - number of nodes in the height and width dimensions
+
+    cache_dir : string, optional
+        directory of the on-disk store, by default is None, which disables the on-disk store
+
+    offset : list, optional
+        [x, y] offset the lists in the X-Y axis, by default is None
+
+    color : tuple, optional
+        (r, g, b) color of the text and grid, by default is White
+
+    font_size : integer, optional
+        size of the text, by default is node_size // 2
+
+    Returns
+    -------
+    path_lists : tuple
+        a tuple of the row sprite list
+    '''
+    if font_size is None:
+        font_size = node_size // 2
+    total_nodes = node_shape[Dmn.W] * node_shape[Dmn.H]
+    # The row is labeled with the path orders, so it doesn't depend on the path itself
+    labels = np.arange(total_nodes).reshape(1, total_nodes)
+    name = get_overlay_name(node_size, font_size, color)
+    file_name = f'flat_overlay_{total_nodes}_{name}.png'
+    image = load_overlay_image(labels, node_size, file_name, cache_dir, color, font_size)
+    return (create_overlay_sprite_list(image, f'flat_path_overlay_{total_nodes}_{name}', offset),)
+
+SNAKE_CHUNK_SIZE = 64
+'''
+number of ring buffer positions, whose segments share a shape element list in SnakeRenderer
+'''
+
+
+class SnakeRenderer:
+    '''
+    Draws the snake and the food incrementally.
+    The segments are grouped into chunks by their position in the ring buffer of the SnakeBody,
+    which doesn't change while the segment is part of the snake. A move only rebuilds the chunks
+    of the new head, the old head, the removed tail and the new tail, so the cost of a frame
+    doesn't depend on the length of the snake.
+    '''
+
+    def __init__(self, node_size, node_shape, screen_height, offset = None, chunk_size = SNAKE_CHUNK_SIZE):
+        '''
+        initialize the SnakeRenderer class
+
+        Parameters
+        ----------
+        node_size : integer
+            width and height of a node in pixels
+
+        node_shape : array
+            node shape HxW - number of nodes in the height and width dimensions
+
+        screen_height : integer
+            the height of the screen in pixels
+
+        offset : list, optional
+            [x, y] offset the snake and the food in the X-Y axis, by default is None
+
+        chunk_size : integer, optional
+            number of ring buffer positions in a chunk, by default is SNAKE_CHUNK_SIZE
+
+        Raises
+        ------
+        ValueError
+            if chunk_size isn't positive
+        '''
+        if chunk_size <= 0:
+            raise ValueError(f'invalid chunk size {chunk_size}! it must be positive')
+        self.m_node_size = node_size
+        self.m_node_shape = node_shape
+        self.m_screen_height = screen_height
+        self.m_offset = offset
+        self.m_chunk_size = chunk_size
+        self.m_chunk_lists = []
+        self.m_food_list = None
+        self.m_snake = None
+        self.m_head_slot = 0
+        self.m_length = 0
+        self.m_push_count = 0
+        self.m_generation = 0
+        self.m_head_dir = None
+        self.m_food = None
+
+    def update(self, snake_body, snake_head_dir, food):
+        '''
+        redraw the segments, which changed since the last update.
+        Any number of moves may be made between the updates
+
+        Parameters
+        ----------
+        snake_body : SnakeBody
+            the snake to be drawn
+
+        snake_head_dir : Dir or integer
+            direction or direction code the snake head is pointing to
+
+        food : integer
+            food node id
+
+        Raises
+        ------
+        TypeError
+            if snake_head_dir isn't a Dir or a direction code
+        '''
+        snake_head_dir = nav.to_dir_code(snake_head_dir)
+        capacity = snake_body.capacity()
+        head_slot = snake_body.head_slot()
+        length = len(snake_body)
+        pushes = snake_body.push_count() - self.m_push_count
+        pops = self.m_length + pushes - length
+        # Anything, which can't be explained by the moves since the last update, redraws the whole snake
+        is_rebuild = (snake_body is not self.m_snake or snake_body.generation() != self.m_generation
+                      or pushes < 0 or pushes >= capacity or pops < 0
+                      or head_slot != (self.m_head_slot - pushes) % capacity)
+
+        if is_rebuild:
+            slots = np.arange(capacity)
+        else:
+            # The new heads and the old head, which turns into a body segment
+            head_indices = np.arange(min(pushes + 1, length))
+            if snake_head_dir != self.m_head_dir:
+                head_indices = np.union1d(head_indices, [0])
+            # The removed tails, which are right after the new tail, and the new tail
+            tail_indices = np.arange(length - 1, length + pops)
+            slots = np.unique((head_slot + np.concatenate((head_indices, tail_indices))) % capacity)
+        self.redraw_slots(snake_body, slots, snake_head_dir, is_rebuild)
+
+        if is_rebuild or food != self.m_food:
+            self.redraw_food(food)
+
+        self.m_snake = snake_body
+        self.m_head_slot = head_slot
+        self.m_length = length
+        self.m_push_count = snake_body.push_count()
+        self.m_generation = snake_body.generation()
+        self.m_head_dir = snake_head_dir
+        self.m_food = food
+
+    def redraw_slots(self, snake_body, slots, snake_head_dir, is_rebuild):
+        '''
+        rebuild the chunks of the specified ring buffer positions
+
+        Parameters
+        ----------
+        snake_body : SnakeBody
+            the snake to be drawn
+
+        slots : array
+            sorted ring buffer positions, which changed
+
+        snake_head_dir : integer
+            direction code the snake head is pointing to
+
+        is_rebuild : bool
+            whether every position changed
+        '''
+        if is_rebuild:
+            self.m_chunk_lists = [None] * -(-snake_body.capacity() // self.m_chunk_size)
+        for chunk in np.unique(slots // self.m_chunk_size):
+            self.m_chunk_lists[chunk] = self.create_chunk_list(snake_body, chunk, snake_head_dir)
+
+    def redraw_food(self, food):
+        '''
+        rebuild the food shape
+
+        Parameters
+        ----------
+        food : integer
+            food node id
+        '''
+        self.m_food_list = arcade.ShapeElementList()
+        self.m_food_list.append(create_food(food, self.m_node_size, self.m_node_shape[Dmn.W], self.m_screen_height))
+        if self.m_offset is not None:
+            self.m_food_list.move(self.m_offset[Axis.X], self.m_offset[Axis.Y])
+
+    def create_chunk_list(self, snake_body, chunk, snake_head_dir):
+        '''
+        create the shape element list of a chunk
+
+        Parameters
+        ----------
+        snake_body : SnakeBody
+            the snake to be drawn
+
+        chunk : integer
+            index of the chunk
+
+        snake_head_dir : integer
+            direction code the snake head is pointing to
+
+        Returns
+        -------
+        chunk_list : ShapeElementList
+            the shapes of the segments in the chunk, None if the chunk is empty
+        '''
+        capacity = snake_body.capacity()
+        slots = np.arange(chunk * self.m_chunk_size, min((chunk + 1) * self.m_chunk_size, capacity))
+        indices = (slots - snake_body.head_slot()) % capacity
+        indices = indices[indices < len(snake_body)]
+        if len(indices) == 0:
+            return None
+
+        chunk_list = arcade.ShapeElementList()
+        for index in indices:
+            segments = create_snake_segment(snake_body, index, snake_head_dir, self.m_node_size,
+                                            self.m_node_shape, self.m_screen_height)
+            for segment in segments:
+                chunk_list.append(segment)
+        if self.m_offset is not None:
+            chunk_list.move(self.m_offset[Axis.X], self.m_offset[Axis.Y])
+        return chunk_list
+
+    def draw(self):
+        '''
+        draw the snake and the food
+        '''
+        for chunk_list in self.m_chunk_lists:
+            if chunk_list is not None:
+                chunk_list.draw()
+        if self.m_food_list is not None:
+            self.m_food_list.draw()
+
+
+def to_image_points(offsets, node_size):
+    '''
+    convert offsets from the center of a node to pixel coordinates in a node image,
+    whose y axis points down
+
+    Parameters
+    ----------
+    offsets : tuple
+        (x, y) offsets from the center of the node, whose y axis points up
+
+    node_size : integer
+        width and height of a node in pixels
+
+    Returns
+    -------
+    points : list
+        (x, y) pixel coordinates in the image
+    '''
+    half = node_size * 0.5
+    return [(half + x, half - y) for x, y in offsets]
+
+@lru_cache(maxsize=8)
+def create_segment_textures(node_size):
+    '''
+    draw every variant of the snake segments and the food once.
+    The images match the shapes of create_snake_segment and create_food
+
+    Parameters
+    ----------
+    node_size : integer
+        width and height of a node in pixels
+
+    Returns
+    -------
+    textures : dict
+        textures, whose keys are the segment keys of get_segment_key and SegmentKind.FOOD for the food
+    '''
+    def create_texture(name, draw_func):
+        image = Image.new('RGBA', (node_size, node_size), (0, 0, 0, 0))
+        draw_func(ImageDraw.Draw(image))
+        return arcade.Texture(f'snake_{name}_{node_size}', image, hit_box_algorithm='None')
+
+    half = node_size * 0.5
+    quart = node_size * 0.25
+    textures = {}
+    for dir in range(len(nav.DIRS)):
+        head = to_image_points(get_snake_head_offsets(dir, node_size), node_size)
+        textures[(SegmentKind.HEAD, dir)] = create_texture(
+            f'head_{dir}', lambda draw: draw.polygon(head, fill=arcade.color.ALIZARIN_CRIMSON))
+
+        tail = to_image_points(get_snake_tail_offsets(dir, node_size), node_size)
+        def draw_tail(draw):
+            draw.polygon(tail, fill=arcade.color.UFO_GREEN)
+            draw.polygon(tail[1:4], fill=arcade.color.BLACK)
+        textures[(SegmentKind.TAIL, dir)] = create_texture(f'tail_{dir}', draw_tail)
+
+    # The body is a thick line from the center to the edges of the previous and the next nodes
+    dir_rects = (
+        ((-quart, half), (quart, 0)),
+        ((0, quart), (half, -quart)),
+        ((-quart, 0), (quart, -half)),
+        ((-half, quart), (0, -quart)),
+    )
+    for prev_dir in range(len(nav.DIRS)):
+        for next_dir in range(len(nav.DIRS)):
+            def draw_body(draw):
+                for dir in [prev_dir, next_dir]:
+                    rect = to_image_points(dir_rects[dir], node_size)
+                    draw.rectangle(rect, fill=arcade.color.UFO_GREEN)
+            textures[(SegmentKind.BODY, prev_dir, next_dir)] = create_texture(f'body_{prev_dir}_{next_dir}', draw_body)
+
+    textures[SegmentKind.FOOD] = create_texture(
+        'food', lambda draw: draw.ellipse((0, 0, node_size - 1, node_size - 1), fill=arcade.color.RED_VIOLET))
+    return textures
+
+
+class SnakeSpriteRenderer(SnakeRenderer):
+    '''
+    Draws the snake and the food as a sprite list with a single draw call.
+    Every ring buffer position of the SnakeBody has its own sprite, which gets
+    the pre-drawn texture of its segment variant, when the segment changes.
+    '''
+
+    def __init__(self, node_size, node_shape, screen_height, offset = None):
+        '''
+        initialize the SnakeSpriteRenderer class
+
+        Parameters
+        ----------
+        node_size : integer
+            width and height of a node in pixels
+
+        node_shape : array
+            node shape HxW - number of nodes in the height and width dimensions
+
+        screen_height : integer
+            the height of the screen in pixels
+
+        offset : list, optional
+            [x, y] offset the snake and the food in the X-Y axis, by default is None
+        '''
+        super().__init__(node_size, node_shape, screen_height, offset)
+        self.m_textures = create_segment_textures(node_size)
+        self.m_sprite_list = arcade.SpriteList()
+        self.m_sprites = []
+        self.m_food_sprite = arcade.Sprite(texture=self.m_textures[SegmentKind.FOOD])
+        self.m_food_sprite.visible = False
+        self.m_sprite_list.append(self.m_food_sprite)
+
+    def get_pixel_coords(self, node_id):
+        '''
+        get the pixel coordinates of the center of a node
+
+        Parameters
+        ----------
+        node_id : integer
+            node id of the square
+
+        Returns
+        -------
+        [x, y]: tuple
+            (x, y) tuple of pixel coordinates, including the offset
+        '''
+        coords = get_coords(node_id, self.m_node_size, self.m_node_shape[Dmn.W], self.m_screen_height)
+        if self.m_offset is None:
+            return coords
+        return (coords[Axis.X] + self.m_offset[Axis.X], coords[Axis.Y] + self.m_offset[Axis.Y])
+
+    def redraw_slots(self, snake_body, slots, snake_head_dir, is_rebuild):
+        '''
+        re-texture and reposition the sprites of the specified ring buffer positions
+
+        Parameters
+        ----------
+        snake_body : SnakeBody
+            the snake to be drawn
+
+        slots : array
+            sorted ring buffer positions, which changed
+
+        snake_head_dir : integer
+            direction code the snake head is pointing to
+
+        is_rebuild : bool
+            whether every position changed
+        '''
+        capacity = snake_body.capacity()
+        if len(self.m_sprites) != capacity:
+            # The food sprite stays last, so it's drawn on top of the snake
+            self.m_sprite_list.remove(self.m_food_sprite)
+            for sprite in self.m_sprites[capacity:]:
+                self.m_sprite_list.remove(sprite)
+            del self.m_sprites[capacity:]
+            while len(self.m_sprites) < capacity:
+                sprite = arcade.Sprite(texture=self.m_textures[SegmentKind.FOOD])
+                sprite.visible = False
+                self.m_sprites.append(sprite)
+                self.m_sprite_list.append(sprite)
+            self.m_sprite_list.append(self.m_food_sprite)
+
+        indices = (slots - snake_body.head_slot()) % capacity
+        for slot, index in zip(slots, indices):
+            sprite = self.m_sprites[slot]
+            sprite.visible = bool(index < len(snake_body))
+            if sprite.visible:
+                sprite.texture = self.m_textures[get_segment_key(snake_body, index, snake_head_dir, self.m_node_shape)]
+                sprite.center_x, sprite.center_y = self.get_pixel_coords(snake_body[index])
+
+    def redraw_food(self, food):
+        '''
+        move the food sprite
+
+        Parameters
+        ----------
+        food : integer
+            food node id
+        '''
+        self.m_food_sprite.visible = food >= 0
+        if self.m_food_sprite.visible:
+            self.m_food_sprite.center_x, self.m_food_sprite.center_y = self.get_pixel_coords(food)
+
+    def draw(self):
+        '''
+        draw the snake and the food
+        '''
+        self.m_sprite_list.draw()
+
+
+RASTER_VERTEX_SHADER = '''
+#version 330
+in vec2 in_vert;
+in vec2 in_uv;
+out vec2 uv;
+void main() {
+    gl_Position = vec4(in_vert, 0.0, 1.0);
+    // Row 0 of the image is the top row of the grid
+    uv = vec2(in_uv.x, 1.0 - in_uv.y);
+}
+'''
+'''
+vertex shader of SnakeRasterRenderer, the quad is specified in normalized device coordinates
+'''
+
+RASTER_FRAGMENT_SHADER = '''
+#version 330
+uniform sampler2D grid;
+in vec2 uv;
+out vec4 fragColor;
+void main() {
+    fragColor = texture(grid, uv);
+}
+'''
+'''
+fragment shader of SnakeRasterRenderer
+'''
+
+
+def to_rgba(color):
+    '''
+    Parameters
+    ----------
+    color : tuple
+        (r, g, b) or (r, g, b, a) color
+
+    Returns
+    -------
+    array
+        (r, g, b, a) uint8 array of the color
+    '''
+    return np.array(tuple(color[:3]) + (color[3] if len(color) > 3 else 255,), dtype=np.uint8)
+
+def create_path_order_colors(path, near_color = arcade.color.DARK_BLUE, far_color = arcade.color.DARK_RED):
+    '''
+    color every node by its order in the hamiltonian path
+
+    Parameters
+    ----------
+    path : array
+        hamiltonian path, node id -> path order
+
+    near_color : tuple, optional
+        (r, g, b) color of the first node in the path, by default is DARK_BLUE
+
+    far_color : tuple, optional
+        (r, g, b) color of the last node in the path, by default is DARK_RED
+
+    Returns
+    -------
+    colors : array
+        (N, 4) uint8 array of the RGBA colors of the nodes
+    '''
+    path = np.asarray(path)
+    weights = path / max(1, len(path) - 1)
+    colors = (1 - weights[:, None]) * to_rgba(near_color) + weights[:, None] * to_rgba(far_color)
+    return np.rint(colors).astype(np.uint8)
+
+
+class SnakeRasterRenderer(SnakeRenderer):
+    '''
+    Draws the snake and the food as an image of the grid with a pixel per node.
+    The changed nodes are written into a numpy array, which is uploaded as a single texture
+    once per frame and drawn scaled to the window, so boards with hundreds of nodes per side can be drawn.
+    '''
+
+    def __init__(self, node_size, node_shape, screen_height, offset = None, path = None):
+        '''
+        initialize the SnakeRasterRenderer class
+
+        Parameters
+        ----------
+        node_size : integer
+            width and height of a node in pixels
+
+        node_shape : array
+            node shape HxW - number of nodes in the height and width dimensions
+
+        screen_height : integer
+            the height of the screen in pixels
+
+        offset : list, optional
+            [x, y] offset the grid in the X-Y axis, by default is None
+
+        path : array, optional
+            hamiltonian path, which colors the free nodes by their path order,
+            by default is None, which leaves them black
+        '''
+        super().__init__(node_size, node_shape, screen_height, offset)
+        node_count = node_shape[Dmn.H] * node_shape[Dmn.W]
+        if path is None:
+            self.m_background = np.zeros(shape=(node_count, 4), dtype=np.uint8)
+        else:
+            self.m_background = create_path_order_colors(path)
+        self.m_background.flags.writeable = False
+        self.m_head_color = to_rgba(arcade.color.ALIZARIN_CRIMSON)
+        self.m_body_color = to_rgba(arcade.color.UFO_GREEN)
+        self.m_food_color = to_rgba(arcade.color.RED_VIOLET)
+        self.m_pixels = self.m_background.copy()
+        self.m_slot_nodes = np.empty(shape=0, dtype=np.int64)
+        self.m_is_snake = np.zeros(shape=node_count, dtype=bool)
+        self.m_is_dirty = True
+        self.m_texture = None
+        self.m_program = None
+        self.m_geometry = None
+        self.m_window_size = None
+
+    def redraw_slots(self, snake_body, slots, snake_head_dir, is_rebuild):
+        '''
+        repaint the nodes of the specified ring buffer positions
+
+        Parameters
+        ----------
+        snake_body : SnakeBody
+            the snake to be drawn
+
+        slots : array
+            sorted ring buffer positions, which changed
+
+        snake_head_dir : integer
+            direction code the snake head is pointing to
+
+        is_rebuild : bool
+            whether every position changed
+        '''
+        capacity = snake_body.capacity()
+        if is_rebuild:
+            self.m_pixels[:] = self.m_background
+            self.m_slot_nodes = np.full(shape=capacity, fill_value=-1, dtype=np.int64)
+            self.m_is_snake[:] = False
+
+        # Clear the nodes, which the positions used to hold, before painting the new ones,
+        # since a node may move between positions in the same update
+        old_nodes = self.m_slot_nodes[slots]
+        old_nodes = old_nodes[old_nodes >= 0]
+        self.m_pixels[old_nodes] = self.m_background[old_nodes]
+        self.m_is_snake[old_nodes] = False
+
+        indices = (slots - snake_body.head_slot()) % capacity
+        is_part = indices < len(snake_body)
+        nodes = snake_body.nodes_at(indices[is_part])
+        self.m_pixels[nodes] = self.m_body_color
+        self.m_is_snake[nodes] = True
+        if len(snake_body) > 0:
+            self.m_pixels[snake_body.head()] = self.m_head_color
+        self.m_slot_nodes[slots] = -1
+        self.m_slot_nodes[slots[is_part]] = nodes
+        self.m_is_dirty = True
+
+    def redraw_food(self, food):
+        '''
+        repaint the old and the new food nodes
+
+        Parameters
+        ----------
+        food : integer
+            food node id
+        '''
+        # The old food is usually the new head, which keeps its color
+        if self.m_food is not None and self.m_food >= 0 and not self.m_is_snake[self.m_food]:
+            self.m_pixels[self.m_food] = self.m_background[self.m_food]
+        if food >= 0:
+            self.m_pixels[food] = self.m_food_color
+        self.m_is_dirty = True
+
+    def draw(self):
+        '''
+        upload the image of the grid, if it changed, and draw it
+        '''
+        window = arcade.get_window()
+        grid_h = self.m_node_shape[Dmn.H]
+        grid_w = self.m_node_shape[Dmn.W]
+        if self.m_texture is None:
+            ctx = window.ctx
+            self.m_texture = ctx.texture((int(grid_w), int(grid_h)), components=4,
+                                         filter=(ctx.NEAREST, ctx.NEAREST))
+            self.m_program = ctx.program(vertex_shader=RASTER_VERTEX_SHADER,
+                                         fragment_shader=RASTER_FRAGMENT_SHADER)
+        if self.m_window_size != (window.width, window.height):
+            # Scale the grid to the window, keeping the nodes square, and convert it to normalized device coordinates
+            self.m_window_size = (window.width, window.height)
+            offset = (0, 0) if self.m_offset is None else self.m_offset
+            scale = min((window.width - offset[Axis.X]) / grid_w, (window.height - offset[Axis.Y]) / grid_h)
+            size = (2 * grid_w * scale / window.width, 2 * grid_h * scale / window.height)
+            left = 2 * offset[Axis.X] / window.width - 1
+            # The top row of the grid is at the top of the window, the same as in get_coords
+            self.m_geometry = geometry.quad_2d(size=size, pos=(left + size[0] * 0.5, 1 - size[1] * 0.5))
+        if self.m_is_dirty:
+            self.m_texture.write(self.m_pixels.tobytes())
+            self.m_is_dirty = False
+        self.m_texture.use(0)
+        self.m_geometry.render(self.m_program)
+
+
+WINDOW_DISPLAY_FRACTION = 0.9
+'''
+fraction of the display, which fit_node_size fills at most
+'''
+
+
+def fit_node_size(node_size, node_shape, max_window_size = None):
+    '''
+    shrink the nodes, so the grid fits in a window of the specified size
+
+    Parameters
+    ----------
+    node_size : integer
+        preferred width and height of a node in pixels
+
+    node_shape : array
+        node shape HxW - number of nodes in the height and width dimensions
+
+    max_window_size : tuple, optional
+        (width, height) maximum size of the window in pixels,
+        by default is None, which is WINDOW_DISPLAY_FRACTION of the display
+
+    Returns
+    -------
+    node_size : number
+        the node size, which is at most the preferred one. It's a whole number of pixels,
+        unless the grid has more nodes than the window has pixels
+    '''
+    if max_window_size is None:
+        display_w, display_h = arcade.get_display_size()
+        max_window_size = (display_w * WINDOW_DISPLAY_FRACTION, display_h * WINDOW_DISPLAY_FRACTION)
+    fit_size = min(max_window_size[Axis.X] / node_shape[Dmn.W], max_window_size[Axis.Y] / node_shape[Dmn.H])
+    if fit_size >= node_size:
+        return node_size
+    return int(fit_size) if fit_size >= 1 else fit_size
+
+
+def create_snake_renderer(render_mode, node_size, node_shape, screen_height, offset = None, path = None):
+    '''
+    create the renderer of the specified backend
+
+    Parameters
+    ----------
+    render_mode : RenderMode
+        backend, which draws the snake and the food
+
+    node_size : integer
+        width and height of a node in pixels
+
+    node_shape : array
+        node shape HxW - number of nodes in the height and width dimensions
+
+    screen_height : integer
+        the height of the screen in pixels
+
+    offset : list, optional
+        [x, y] offset the snake and the food in the X-Y axis, by default is None
+
+    path : array, optional
+        hamiltonian path, which colors the free nodes of RenderMode.RASTER by their path order,
+        by default is None
+
+    Returns
+    -------
+    renderer : SnakeRenderer
+        the renderer
+
+    Raises
+    ------
+    ValueError
+        if render_mode isn't a valid RenderMode
+    '''
+    if render_mode == RenderMode.RASTER:
+        return SnakeRasterRenderer(node_size, node_shape, screen_height, offset = offset, path = path)
+    renderers = {
+        RenderMode.SHAPES: SnakeRenderer,
+        RenderMode.SPRITES: SnakeSpriteRenderer,
+    }
+    renderer = renderers.get(render_mode)
+    if renderer is None:
+        raise ValueError(f'invalid render mode {render_mode}!')
+    return renderer(node_size, node_shape, screen_height, offset = offset)
@@ -9,6 +9,7 @@ import snake
 from snake import SnakeStatus
 import move_algo
 from move_algo import Algo
+from scheduler import StepScheduler
 
 import draw_utils as du
 
@@ -20,7 +21,13 @@ class SnakeGame(arcade.Window):
     def __init__(self, title, fps, node_shape, node_size, algo = Algo.NONE, seed = None,
                  is_show_path = False, is_pause_update = False,
                  is_draw_flat_path = False,
-                 is_print_path = False):
+                 is_print_path = False,
+                 render_mode = du.RenderMode.SHAPES,
+                 overlay_cache_dir = None,
+                 is_color_path = False,
+                 steps_per_second = None,
+                 is_turbo = False,
+                 max_window_size = None):
         '''
         initialize the SnakeGame class
 
@@ -52,6 +59,29 @@ class SnakeGame(arcade.Window):
 
         is_draw_flat_path : bool, optional
             whether to draw the hamiltonian path flat below the grid
+
+        is_print_path : bool, optional
+            whether to print the hamiltonian path and its spanning tree, by default is false
+
+        render_mode : RenderMode, optional
+            backend, which draws the snake and the food, by default is RenderMode.SHAPES
+
+        overlay_cache_dir : string, optional
+            directory, where the path overlays are stored between launches, by default is None
+
+        is_color_path : bool, optional
+            whether RenderMode.RASTER colors the free nodes by their order in the path, by default is false
+
+        steps_per_second : float, optional
+            number of logic steps per second, independent of the frame rate,
+            by default is None, which makes a step per frame
+
+        is_turbo : bool, optional
+            whether to make as many steps as fit in a frame, by default is false
+
+        max_window_size : tuple, optional
+            (width, height) maximum window size in pixels for RenderMode.RASTER, which shrinks
+            the nodes to fit it. By default is None, which fits the window to the display
         '''
         self.m_node_shape = nav.create_pos(node_shape[Dmn.H], node_shape[Dmn.W])
         # Limit the size of the node shape
@@ -60,14 +90,16 @@ class SnakeGame(arcade.Window):
             self.m_node_shape[Dmn.W] = min(self.m_node_shape[Dmn.W], 6)
 
         self.m_node_size = node_size
+        if render_mode == du.RenderMode.RASTER:
+            self.m_node_size = du.fit_node_size(node_size, self.m_node_shape, max_window_size)
         self.m_algo = algo
         self.m_seed = seed
         self.m_is_show_path = is_show_path
         self.m_is_pause_update = is_pause_update
 
         # Configure screen size
-        self.m_grid_size[Dmn.W] = np.int64(self.m_node_shape[Dmn.W] * self.m_node_size)
-        self.m_grid_size[Dmn.H] = np.int64(self.m_node_shape[Dmn.H] * self.m_node_size)
+        self.m_grid_size[Dmn.W] = max(1, np.int64(self.m_node_shape[Dmn.W] * self.m_node_size))
+        self.m_grid_size[Dmn.H] = max(1, np.int64(self.m_node_shape[Dmn.H] * self.m_node_size))
 
         screen_width = self.m_grid_size[Dmn.W]
         screen_height = self.m_grid_size[Dmn.H]
@@ -79,12 +111,25 @@ class SnakeGame(arcade.Window):
                                                 y = screen_height - self.m_grid_size[Dmn.H])
 
         super().__init__(screen_width, screen_height, title, update_rate=1/fps)
+        self.m_scheduler = StepScheduler(fps if steps_per_second is None else steps_per_second, 1 / fps, is_turbo)
 
         arcade.set_background_color(arcade.color.BLACK)
         # If you have sprite lists, you should create them here,
         # and set them to None
 
-        self.m_path = hcg.generate_path(self.m_node_shape, self.m_seed, is_print_path)
+        if is_print_path:
+            self.m_path = hcg.generate_path(self.m_node_shape, self.m_seed, is_print_path)
+        else:
+            self.m_path = hcg.get_path(self.m_node_shape, self.m_seed)
+        # Every algorithm keeps its own state, so several games can run in one process.
+        # A seeded path is the same for every game of the shape, so its tables come from the path cache
+        if self.m_seed is None:
+            path_tables = hcg.PathTables(self.m_path)
+        else:
+            path_tables = hcg.get_path_tables(self.m_node_shape, self.m_seed)
+        self.m_planners = {}
+        for planner_algo in [Algo.FOLLOW_PATH, Algo.TAKE_SHORTCUTS]:
+            self.m_planners[planner_algo] = move_algo.create_planner(planner_algo, path_tables, self.m_node_shape)
         if is_print_path:
             row = ""
             for i in range(len(self.m_path)):
@@ -94,12 +139,15 @@ class SnakeGame(arcade.Window):
                     row = ""
             print(f'\n\npath:\n{self.m_path}')
         if is_show_path or is_draw_flat_path:
-            print(f'Creating grid sprite. Please wait...')
-            self.m_path_lists = du.create_path_lists(self.m_path, self.m_node_size, self.m_node_shape,
-                                                     self.m_grid_size[Dmn.W], self.m_grid_size[Dmn.H],
-                                                     offset = self.m_grid_offset)
+            self.m_path_lists = du.create_path_overlay_lists(self.m_path, self.m_node_size, self.m_node_shape,
+                                                             seed = self.m_seed, cache_dir = overlay_cache_dir,
+                                                             offset = self.m_grid_offset)
             if is_draw_flat_path:
-                self.m_flat_path_lists = du.create_flat_path_lists(self.m_path, self.m_node_size, self.m_node_shape)
+                self.m_flat_path_lists = du.create_flat_path_overlay_lists(self.m_node_size, self.m_node_shape,
+                                                                           cache_dir = overlay_cache_dir)
+        self.m_snake_renderer = du.create_snake_renderer(render_mode, self.m_node_size, self.m_node_shape,
+                                                         self.m_grid_size[Dmn.H], offset = self.m_grid_offset,
+                                                         path = self.m_path if is_color_path else None)
         self.setup()
 
     def setup(self):
@@ -107,12 +155,14 @@ class SnakeGame(arcade.Window):
         self.m_all_nodes = np.arange(self.m_node_shape[Dmn.W] * self.m_node_shape[Dmn.H])
 
         seed_seq = np.random.SeedSequence(entropy=self.m_seed)
-        rng = np.random.default_rng(seed_seq)
-        self.m_snake = rng.integers(len(self.m_all_nodes), size=1, dtype=int)
-        self.m_food = snake.create_food(self.m_snake, self.m_all_nodes, self.m_seed)
-        move_algo.set_path_dir_index(self.m_snake[0], self.m_path)
+        self.m_rng = np.random.default_rng(seed_seq)
+        self.m_snake = snake.SnakeBody(len(self.m_all_nodes),
+                                       self.m_rng.integers(len(self.m_all_nodes), size=1, dtype=int))
+        self.m_food = snake.spawn_food(self.m_snake, self.m_rng)
+        for planner in self.m_planners.values():
+            planner.reset(self.m_snake.head())
 
-        self.recreate_lists()
+        self.m_is_lists_dirty = True
 
     def on_draw(self):
         """
@@ -123,8 +173,12 @@ class SnakeGame(arcade.Window):
         # the screen to the background color, and erase what we drew last frame.
         self.clear()
 
+        # Render the latest state once per frame, however many steps were made since the last one
+        if self.m_is_lists_dirty:
+            self.update_lists()
+
         # Call draw() on all your sprite lists below
-        self.m_snake_list.draw()
+        self.m_snake_renderer.draw()
 
         # Draw the hamiltonian path
         if self.m_path_lists is not None:
@@ -149,11 +203,20 @@ class SnakeGame(arcade.Window):
         if self.m_is_pause_update:
             return
 
-        if self.m_algo is Algo.NONE:
-            self.move_snake(self.m_head_dir)
-        else:
-            self.algo_step(self.m_algo)
+        self.m_scheduler.run(delta_time, self.step)
 
+    def step(self):
+        '''
+        make a single logic step, either in the current head direction or for the game algorithm
+
+        Returns
+        -------
+        status : SnakeStatus
+            the current status of the snake
+        '''
+        if self.m_algo is Algo.NONE:
+            return self.move_snake(self.m_head_dir)
+        return self.algo_step(self.m_algo)
 
     def on_key_press(self, key, key_modifiers):
         if key == arcade.key.P:
@@ -164,6 +227,17 @@ class SnakeGame(arcade.Window):
             title = f'data/screenshot_{time.time()}.png'
             image.save(title, 'PNG')
 
+        # Change the speed of the game
+        if key in [arcade.key.EQUAL, arcade.key.PLUS, arcade.key.NUM_ADD]:
+            steps_per_second = self.m_scheduler.set_steps_per_second(self.m_scheduler.m_steps_per_second * 2)
+            print(f'steps per second: {steps_per_second}')
+        elif key in [arcade.key.MINUS, arcade.key.NUM_SUBTRACT]:
+            steps_per_second = self.m_scheduler.set_steps_per_second(self.m_scheduler.m_steps_per_second / 2)
+            print(f'steps per second: {steps_per_second}')
+        elif key == arcade.key.T:
+            self.m_scheduler.set_turbo(not self.m_scheduler.m_is_turbo)
+            print(f'turbo: {self.m_scheduler.m_is_turbo}')
+
         if self.m_algo is Algo.NONE:
             dirs = {
                  arcade.key.W: Dir.Up,
@@ -193,10 +267,9 @@ class SnakeGame(arcade.Window):
         '''
         dir = None
 
-        if (algo is Algo.FOLLOW_PATH):
-            dir = move_algo.find_next_dir(self.m_path, self.m_node_shape)
-        elif algo is Algo.TAKE_SHORTCUTS:
-            dir = move_algo.find_next_shortcut_dir(self.m_snake, self.m_food, self.m_path, self.m_node_shape)
+        planner = self.m_planners.get(algo)
+        if planner is not None:
+            dir = planner.next_dir(self.m_snake, self.m_food)
 
         status = SnakeStatus.LOST
         if dir is not None:
@@ -209,8 +282,8 @@ class SnakeGame(arcade.Window):
 
         Parameters
         ----------
-        dir : Dir
-            direction in which to move the snake
+        dir : Dir or integer
+            direction or direction code in which to move the snake
 
         Returns
         -------
@@ -220,22 +293,18 @@ class SnakeGame(arcade.Window):
         self.m_head_dir = dir
         self.m_snake, self.m_food, status = snake.move(self.m_snake, self.m_head_dir,
                                                        self.m_food, self.m_all_nodes,
-                                                       self.m_seed, self.m_node_shape)
-        self.recreate_lists()
+                                                       self.m_seed, self.m_node_shape, self.m_rng)
+        self.m_is_lists_dirty = True
         if status in [SnakeStatus.LOST, SnakeStatus.WON]:
             self.setup()
         return status
 
-    def recreate_lists(self):
+    def update_lists(self):
         '''
-        recreate snake and food lists
+        update the snake and food shapes, which changed since the last update
         '''
-        self.m_snake_list = du.create_snake_list(self.m_snake, self.m_head_dir, self.m_node_size,
-                                                 self.m_node_shape, self.m_grid_size[Dmn.H],
-                                                 offset = self.m_grid_offset)
-        food_shape = du.create_food(self.m_food, self.m_node_size,
-                                    self.m_node_shape[Dmn.W], self.m_grid_size[Dmn.H])
-        self.m_snake_list.append(food_shape)
+        self.m_snake_renderer.update(self.m_snake, self.m_head_dir, self.m_food)
+        self.m_is_lists_dirty = False
 
         if self.m_flat_path_lists is not None:
             self.m_flat_snake_list = du.create_flat_snake_list(self.m_snake, self.m_food, self.m_path,
@@ -256,9 +325,14 @@ class SnakeGame(arcade.Window):
     m_path - current hamiltonian cycle
     '''
 
+    m_planners = {}
+    '''
+    m_planners - per-game state of the movement algorithms, the keys are Algo values
+    '''
+
     m_snake = snake.create_empty_snake()
     '''
-    m_snake - current hamiltonian cycle
+    m_snake - current snake body
     '''
 
     m_food = -1
@@ -282,9 +356,14 @@ class SnakeGame(arcade.Window):
     m_seed - used to seed the default rng
     '''
 
+    m_rng = None
+    '''
+    m_rng - random generator of the current game, used to spawn the food
+    '''
+
     m_head_dir = Dir.Up
     '''
-    m_head_dir - snake head direction
+    m_head_dir - snake head direction, either a Dir or a direction code
     '''
 
     m_is_pause_update = False
@@ -292,14 +371,24 @@ class SnakeGame(arcade.Window):
     m_is_pause_update - flag for pausing the update loop
     '''
 
-    m_snake_list = None
+    m_scheduler = None
+    '''
+    m_scheduler - fixed-timestep scheduler of the logic steps
+    '''
+
+    m_is_lists_dirty = True
+    '''
+    m_is_lists_dirty - whether the snake or the food changed since the last rendered frame
+    '''
+
+    m_snake_renderer = None
     '''
-    m_snake_list - snake segment shape list
+    m_snake_renderer - incrementally updated snake and food, drawn by the selected RenderMode backend
     '''
 
     m_path_lists = None
     '''
-    m_path_lists - text sprite and grid shape lists for m_path
+    m_path_lists - labeled grid sprite list for m_path
     '''
 
     m_grid_size = nav.create_pos()
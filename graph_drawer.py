@@ -2,15 +2,16 @@ import networkx as nx
 import matplotlib.pyplot as plt
 import matplotlib.animation as animation
 import numpy as np
+import os
 from itertools import combinations
 import scipy as sp
 from IPython.display import HTML, SVG, display, Video
-import pandas as pd
 
 import nav
 from nav import Dir, Axis, Dmn
 
 import hamilton_cycle_generator as hcg
+import sim_io
 from move_algo import Algo
 
 # Disable jupyter auto-show of plots
@@ -267,7 +268,7 @@ def animate_prim_mst(shape, seed, is_html=False, node_size=300):
     '''
     shape = nav.create_pos(shape[Dmn.H], shape[Dmn.W])
     mst, mst_edge_order = hcg.generate_prim_mst(shape, seed)
-    hamilton_path = hcg.generate_hamilton_cycle(mst, shape)
+    hamilton_path = hcg.generate_hamilton_cycle_vectorized(mst, shape)
 
     fig = plt.figure(figsize=[4, 4])
 
@@ -411,13 +412,19 @@ def plot_simulation_data(path):
     Parameters
     ----------
     path : string
-        simulation.json path
+        path of the simulation, either a .json, a streamed .jsonl or a binary .sim file.
+        Only the two plotted games are read from a binary .sim file
     '''
-    get_key = lambda shape, seed, algo, game: f'shape_{shape[Dmn.H]}x{shape[Dmn.W]}_seed_{seed}_algo_{algo}_game_{game}'
-
-    sim_data = pd.read_json(path).to_dict()
+    if os.path.splitext(path)[1] == sim_io.BINARY_EXTENSION:
+        store = sim_io.SimulationStore(path)
+        params = store.params()
+        get_moves = store.get_moves
+    else:
+        sim_data = sim_io.read_simulation(path)
+        params = sim_data["params"]
+        data = sim_data["data"]
+        get_moves = lambda shape, seed, algo, game: data[sim_io.create_moves_key(shape, seed, algo, game)]
 
-    params = sim_data["params"]
     node_shapes = params["node_shapes"]
     seeds = params["seeds"]
     games_per_seed = params["games_per_seed"]
@@ -427,9 +434,8 @@ def plot_simulation_data(path):
     rand_seed = rng.choice(seeds)
     rand_game = np.random.randint(games_per_seed)
 
-    data = sim_data["data"]
-    moves_full = data[get_key(rand_shape, rand_seed, Algo.FOLLOW_PATH, rand_game)]
-    moves_shortcut = data[get_key(rand_shape, rand_seed, Algo.TAKE_SHORTCUTS, rand_game)]
+    moves_full = get_moves(rand_shape, rand_seed, Algo.FOLLOW_PATH, rand_game)
+    moves_shortcut = get_moves(rand_shape, rand_seed, Algo.TAKE_SHORTCUTS, rand_game)
     total_full = np.sum(moves_full)
     total_shortcut = np.sum(moves_shortcut)
     xs = np.arange(len(moves_full))
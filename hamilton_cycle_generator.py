@@ -1,9 +1,387 @@
 import numpy as np
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from enum import IntEnum
 import nav
 from nav import Dir, Axis, Dmn
 
 
-def generate_path(shape, seed=0, is_print_mst=False):
+class MstAlgo(IntEnum):
+    ''' Enumerate the spanning tree algorithms, which guide the hamiltonian cycle '''
+    PRIM = 0
+    KRUSKAL = 1
+    WILSON = 2
+    DFS = 3
+
+
+class PathTables:
+    '''
+    Lookup tables of a hamiltonian cycle. They are built once in O(N),
+    so the order of the nodes never has to be searched for in the path.
+    '''
+
+    def __init__(self, path):
+        '''
+        initialize the PathTables class
+
+        Parameters
+        ----------
+        path : array
+            hamiltonian path, where the indices are node ids and the values are path orders
+        '''
+        size = len(path)
+        # Copy the path, so freezing the tables never makes the caller's array read-only
+        orders = np.array(path, dtype=np.int64)
+        nodes = np.empty(shape=size, dtype=np.int64)
+        nodes[orders] = np.arange(size, dtype=np.int64)
+
+        self.m_orders = orders
+        self.m_nodes = nodes
+        self.m_successors = nodes[(orders + 1) % size]
+        self.m_predecessors = nodes[(orders - 1) % size]
+        for table in [self.m_orders, self.m_nodes, self.m_successors, self.m_predecessors]:
+            table.setflags(write=False)
+
+    def __len__(self):
+        return len(self.m_orders)
+
+    m_orders = np.empty(shape=0, dtype=np.int64)
+    '''
+    m_orders - the path itself, node id -> path order
+    '''
+
+    m_nodes = np.empty(shape=0, dtype=np.int64)
+    '''
+    m_nodes - inverse of the path, path order -> node id
+    '''
+
+    m_successors = np.empty(shape=0, dtype=np.int64)
+    '''
+    m_successors - node id -> id of the next node in the cycle
+    '''
+
+    m_predecessors = np.empty(shape=0, dtype=np.int64)
+    '''
+    m_predecessors - node id -> id of the previous node in the cycle
+    '''
+
+
+class PathCache:
+    '''
+    Memoization layer for generate_path. The paths only depend on the shape, the seed and the mst algorithm,
+    so they are kept in an in-process LRU and, optionally, in an on-disk store,
+    shared between processes and application launches.
+    The LRU and the writes to the on-disk store are guarded by a lock, so the cache can be shared
+    by threads. The paths are generated outside of the lock, so two threads may generate the same path at once.
+    '''
+
+    def __init__(self, max_entries=64, cache_dir=None, max_disk_bytes=256 * 1024 * 1024):
+        '''
+        initialize the PathCache class
+
+        Parameters
+        ----------
+        max_entries : integer, optional
+            maximum number of paths kept in memory, by default is 64
+
+        cache_dir : string, optional
+            directory of the on-disk store, by default is None, which disables the on-disk store
+
+        max_disk_bytes : integer, optional
+            maximum size of the on-disk store in bytes, by default is 256 MiB.
+            The least recently used paths are evicted, once it's exceeded
+        '''
+        self.m_max_entries = max_entries
+        self.m_cache_dir = cache_dir
+        self.m_max_disk_bytes = max_disk_bytes
+        self.m_paths = OrderedDict()
+        self.m_tables = OrderedDict()
+        self.m_lock = threading.Lock()
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def get(self, shape, seed=0, mst_algo=MstAlgo.PRIM):
+        '''
+        retrieve the hamiltonian path for the specified shape and seed, generating it if needed
+
+        Parameters
+        ----------
+        shape : array
+            node shape HxW
+
+        seed : integer, optional
+            used to seed the default rng, by default is 0.
+            If None, the path is random, so it's generated without caching
+
+        mst_algo : MstAlgo, optional
+            spanning tree algorithm, which guides the path, by default is MstAlgo.PRIM
+
+        Returns
+        -------
+        array
+            read-only array, which is the hamiltonian path. The values are node ids.
+        '''
+        if seed is None:
+            return generate_path(shape, seed, mst_algo=mst_algo)
+
+        key = (int(shape[Dmn.H]), int(shape[Dmn.W]), int(seed), int(mst_algo))
+        with self.m_lock:
+            path = self.m_paths.get(key)
+            if path is not None:
+                self.m_paths.move_to_end(key)
+                return path
+
+        path = self.load(key)
+        if path is None:
+            path = generate_path(shape, seed, mst_algo=mst_algo)
+            self.save(key, path)
+        path.setflags(write=False)
+
+        with self.m_lock:
+            # Another thread may have stored the same path in the meantime, keep the first one
+            path = self.m_paths.setdefault(key, path)
+            self.m_paths.move_to_end(key)
+            if len(self.m_paths) > self.m_max_entries:
+                self.m_paths.popitem(last=False)
+        return path
+
+    def get_tables(self, shape, seed=0, mst_algo=MstAlgo.PRIM):
+        '''
+        retrieve the lookup tables of the hamiltonian path for the specified shape and seed,
+        building them if needed
+
+        Parameters
+        ----------
+        shape : array
+            node shape HxW
+
+        seed : integer, optional
+            used to seed the default rng, by default is 0.
+            If None, the path is random, so the tables are built without caching
+
+        mst_algo : MstAlgo, optional
+            spanning tree algorithm, which guides the path, by default is MstAlgo.PRIM
+
+        Returns
+        -------
+        PathTables
+            the lookup tables of the path
+        '''
+        if seed is None:
+            return PathTables(self.get(shape, seed, mst_algo))
+
+        key = (int(shape[Dmn.H]), int(shape[Dmn.W]), int(seed), int(mst_algo))
+        with self.m_lock:
+            tables = self.m_tables.get(key)
+            if tables is not None:
+                self.m_tables.move_to_end(key)
+                return tables
+
+        tables = PathTables(self.get(shape, seed, mst_algo))
+        with self.m_lock:
+            tables = self.m_tables.setdefault(key, tables)
+            self.m_tables.move_to_end(key)
+            if len(self.m_tables) > self.m_max_entries:
+                self.m_tables.popitem(last=False)
+        return tables
+
+    def get_settings(self):
+        '''
+        Returns
+        -------
+        tuple
+            (max_entries, cache_dir, max_disk_bytes) arguments of configure_path_cache,
+            which create a cache with the same settings, e.g. in a worker process
+        '''
+        return (self.m_max_entries, self.m_cache_dir, self.m_max_disk_bytes)
+
+    def get_file_path(self, key):
+        '''
+        retrieve the file path of a path in the on-disk store
+
+        Parameters
+        ----------
+        key : tuple
+            (h, w, seed, mst_algo) key of the path
+
+        Returns
+        -------
+        string
+            path of the .npy file
+        '''
+        h, w, seed, mst_algo = key
+        return os.path.join(self.m_cache_dir, f'path_{h}x{w}_seed_{seed}_mst_{mst_algo}.npy')
+
+    def load(self, key):
+        '''
+        load a path from the on-disk store
+
+        Parameters
+        ----------
+        key : tuple
+            (h, w, seed, mst_algo) key of the path
+
+        Returns
+        -------
+        array
+            the loaded path, or None if it isn't in the store
+        '''
+        if self.m_cache_dir is None:
+            return None
+        file_path = self.get_file_path(key)
+        try:
+            path = np.load(file_path)
+            # Mark the path as recently used for the eviction. Another process may have evicted it already
+            os.utime(file_path)
+        except (OSError, ValueError):
+            return None
+        return path
+
+    def save(self, key, path):
+        '''
+        save a path to the on-disk store and evict the least recently used paths,
+        if the store exceeds its maximum size
+
+        Parameters
+        ----------
+        key : tuple
+            (h, w, seed, mst_algo) key of the path
+
+        path : array
+            the path to be saved
+        '''
+        if self.m_cache_dir is None:
+            return
+        file_path = self.get_file_path(key)
+        with self.m_lock:
+            # Write to a unique temporary file first, so other threads and processes never read a partial file
+            file_handle, temp_path = tempfile.mkstemp(suffix='.tmp', dir=self.m_cache_dir)
+            try:
+                with os.fdopen(file_handle, "wb") as outfile:
+                    np.save(outfile, path)
+                os.replace(temp_path, file_path)
+            except OSError:
+                # Failing to store the path only costs generating it again
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
+                return
+
+            entries = []
+            for entry in os.scandir(self.m_cache_dir):
+                if entry.name.endswith('.npy'):
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+            entries.sort()
+            total_bytes = sum(entry[1] for entry in entries)
+            for _, size, entry_path in entries:
+                if total_bytes <= self.m_max_disk_bytes or entry_path == file_path:
+                    break
+                try:
+                    os.remove(entry_path)
+                except OSError:
+                    pass
+                total_bytes -= size
+
+    def clear(self):
+        '''
+        remove all paths and their tables from memory
+        '''
+        with self.m_lock:
+            self.m_paths.clear()
+            self.m_tables.clear()
+
+
+path_cache = PathCache()
+'''
+path_cache - the path cache used by get_path
+'''
+
+
+def configure_path_cache(max_entries=64, cache_dir=None, max_disk_bytes=256 * 1024 * 1024):
+    '''
+    replace the path cache used by get_path. Only the current process is affected,
+    the worker processes are configured with the settings of PathCache.get_settings
+
+    Parameters
+    ----------
+    max_entries : integer, optional
+        maximum number of paths kept in memory, by default is 64
+
+    cache_dir : string, optional
+        directory of the on-disk store, by default is None, which disables the on-disk store
+
+    max_disk_bytes : integer, optional
+        maximum size of the on-disk store in bytes, by default is 256 MiB
+    '''
+    global path_cache
+    path_cache = PathCache(max_entries, cache_dir, max_disk_bytes)
+
+
+def get_path(shape, seed=0, mst_algo=MstAlgo.PRIM):
+    '''
+    retrieve the hamiltonian path for the specified shape and seed from the path cache.
+    The path is generated only the first time it's requested.
+
+    Parameters
+    ----------
+    shape : array
+        node shape HxW
+
+    seed : integer, optional
+        used to seed the default rng, by default is 0
+
+    mst_algo : MstAlgo, optional
+        spanning tree algorithm, which guides the path, by default is MstAlgo.PRIM
+
+    Returns
+    -------
+    array
+        read-only array, which is the hamiltonian path. The values are node ids.
+
+    Raises
+    ------
+    ValueError
+        if neither of the shape's dimensions is even
+    '''
+    return path_cache.get(shape, seed, mst_algo)
+
+
+def get_path_tables(shape, seed=0, mst_algo=MstAlgo.PRIM):
+    '''
+    retrieve the lookup tables of the hamiltonian path for the specified shape and seed from the path cache
+
+    Parameters
+    ----------
+    shape : array
+        node shape HxW
+
+    seed : integer, optional
+        used to seed the default rng, by default is 0
+
+    mst_algo : MstAlgo, optional
+        spanning tree algorithm, which guides the path, by default is MstAlgo.PRIM
+
+    Returns
+    -------
+    PathTables
+        the lookup tables of the path
+
+    Raises
+    ------
+    ValueError
+        if neither of the shape's dimensions is even
+    '''
+    return path_cache.get_tables(shape, seed, mst_algo)
+
+
+def generate_path(shape, seed=0, is_print_mst=False, mst_algo=MstAlgo.PRIM):
     '''
     generate hamiltonian path
 
@@ -16,7 +394,11 @@ def generate_path(shape, seed=0, is_print_mst=False):
         used to seed the default rng, by default is none
 
     is_print_mst : bool, optional
-        whether to print the minimum spanning tree from Prim's MST algorithm, by default is False
+        whether to print the minimum spanning tree, by default is False
+
+    mst_algo : MstAlgo, optional
+        spanning tree algorithm, which guides the path, by default is MstAlgo.PRIM.
+        It's ignored if the shape has an odd dimension
 
     Returns
     -------
@@ -34,13 +416,12 @@ def generate_path(shape, seed=0, is_print_mst=False):
         raise ValueError(f'failed to generate path! shape: {shape} is not even in any dimension!')
         return np.empty(shape=0, dtype=np.int64)
 
-    # The shape has an odd dimension, so Prim's MST can't be used in this case
+    # The shape has an odd dimension, so an MST can't be used in this case
     if shape[Dmn.W] % 2 != 0 or shape[Dmn.H] % 2 != 0:
         return generate_path_with_odd_dimension(shape)
 
-    # Use Prim's MST to generate an mst and a hamiltonian cycle
-    half_shape = nav.create_pos(shape[Dmn.H] / 2, shape[Dmn.W] / 2)
-    mst, mst_edge_order = generate_prim_mst(shape, seed)
+    # Generate an mst and a hamiltonian cycle around it
+    mst, mst_edge_order = generate_mst(shape, seed, mst_algo)
 
     if is_print_mst:
         print(f'mst: {mst}')
@@ -52,7 +433,113 @@ def generate_path(shape, seed=0, is_print_mst=False):
                     res = f'{res}, {dir}'
             print(f'edge[{i}]: {res}')
         print(f'mst_edge_order:\n{mst_edge_order}')
-    return generate_hamilton_cycle(mst, shape)
+    return generate_hamilton_cycle_vectorized(mst, shape)
+
+
+class FringeSet:
+    '''
+    Indexed set of the fringe nodes in Prim's MST algorithm.
+    The nodes keep the order in which they were added, the same as a list would,
+    but lookup, removal and retrieval by index don't depend on the number of fringes.
+    The order is kept in a Fenwick tree over the slots, in which the nodes were added.
+    '''
+
+    def __init__(self, capacity):
+        '''
+        initialize the FringeSet class
+
+        Parameters
+        ----------
+        capacity : integer
+            maximum number of nodes ever added to the set. Node ids must be less than capacity
+        '''
+        self.m_tree = [0] * (capacity + 1)
+        self.m_nodes = [0] * capacity
+        self.m_slots = [-1] * capacity
+        self.m_slot_count = 0
+        self.m_length = 0
+        self.m_top_bit = 1 << (capacity.bit_length() - 1) if capacity > 0 else 0
+
+    def add(self, node):
+        '''
+        add a node to the end of the set
+
+        Parameters
+        ----------
+        node : integer
+            node id to be added
+        '''
+        slot = self.m_slot_count
+        self.m_slot_count += 1
+        self.m_nodes[slot] = node
+        self.m_slots[node] = slot
+        self.update(slot, 1)
+        self.m_length += 1
+
+    def remove(self, node):
+        '''
+        remove a node from the set
+
+        Parameters
+        ----------
+        node : integer
+            node id to be removed
+        '''
+        self.update(self.m_slots[node], -1)
+        self.m_slots[node] = -1
+        self.m_length -= 1
+
+    def get(self, index):
+        '''
+        retrieve a node by its index in the set
+
+        Parameters
+        ----------
+        index : integer
+            index of the node, must be less than the length of the set
+
+        Returns
+        -------
+        integer
+            node id at the specified index
+        '''
+        tree = self.m_tree
+        tree_size = len(tree)
+        pos = 0
+        remaining = index + 1
+        bit = self.m_top_bit
+        while bit > 0:
+            next_pos = pos + bit
+            if next_pos < tree_size and tree[next_pos] < remaining:
+                pos = next_pos
+                remaining -= tree[next_pos]
+            bit >>= 1
+        return self.m_nodes[pos]
+
+    def update(self, slot, delta):
+        '''
+        update the Fenwick tree with the specified change of a slot
+
+        Parameters
+        ----------
+        slot : integer
+            slot to be updated
+
+        delta : integer
+            change of the number of nodes in the slot
+        '''
+        tree = self.m_tree
+        tree_size = len(tree)
+        i = slot + 1
+        while i < tree_size:
+            tree[i] += delta
+            i += i & -i
+
+    def __len__(self):
+        return self.m_length
+
+    def __contains__(self, node):
+        return self.m_slots[node] >= 0
 
 
 def generate_prim_mst(shape, seed=None):
@@ -82,70 +569,315 @@ def generate_prim_mst(shape, seed=None):
     rng = np.random.default_rng(seed_seq)
     prim_shape = nav.create_pos(shape[Dmn.H] / 2, shape[Dmn.W] / 2)
 
-    size = prim_shape[Dmn.W] * prim_shape[Dmn.H]
-    # Initialize the MST as an array. The indices are node ids, the values are bit masks
+    size = int(prim_shape[Dmn.W] * prim_shape[Dmn.H])
+    # Initialize the MST. The indices are node ids, the values are bit masks
     # that encode the directions to the node's neighbors.
-    mst = np.zeros(size, dtype=np.int8)
+    mst = [0] * size
 
     # Keep track of the order the edges were formed
     edge_order = np.zeros(shape=(size - 1, Axis.COUNT), dtype=np.int64)
 
-    # Create an adjacency list for each node in the grid
-    # The indices of the array are node ids. The values of the array are dictionaries with
-    # keys: neighbor node ids,
-    # values: direction of the neighbor from the node.
-    adjacency_arr = np.array([{} for _ in range(size)])
-    dir_array = nav.get_dir_array()
-    for node_id in range(size):
-        for dir_id in range(len(dir_array)):
-            dir = dir_array[dir_id]
-            neighbor_id = nav.get_next_node_id(node_id, dir, prim_shape)
-            if neighbor_id is not None:
-                adjacency_arr[node_id][neighbor_id] = dir
+    # The rows of the neighbor table are node ids. The columns are the neighbors
+    # of the node in the Up, Right, Down, Left directions, -1 if there is no neighbor.
+    neighbors = nav.get_topology(prim_shape).m_neighbor_lists
+    dir_count = len(Dir)
 
     # Choose a random node to be the start of the MST
-    start = rng.integers(0, size)
-    # Create a list of all fringe nodes that currently neighbor the MST.
-    fringes = list(adjacency_arr[start].keys())
-    # Create a list of all nodes that have already been visited and are part of the MST
-    visited = [start]
+    start = int(rng.integers(0, size))
+    # Keep track of all nodes that have already been visited and are part of the MST
+    visited = bytearray(size)
+    visited[start] = True
+    # Create a set of all fringe nodes that currently neighbor the MST.
+    fringes = FringeSet(size)
+    for neighbor in neighbors[start]:
+        if neighbor >= 0:
+            fringes.add(neighbor)
 
     # Visit all nodes in the graph
-    i = 0
-    while (len(visited) < size):
+    for i in range(size - 1):
         # Pick a random node from the fringes as a candidate to be added to the MST
-        fringe = rng.choice(fringes)
+        fringe = fringes.get(rng.integers(len(fringes)))
         candidates = []
-        new_fringes = []
+        candidate_dirs = []
 
         # Retrieve all the neighbors of the fringe node
-        neighbors = adjacency_arr[fringe].keys()
-        for neighbor in neighbors:
+        for dir_id in range(dir_count):
+            neighbor = neighbors[fringe][dir_id]
+            if neighbor < 0:
+                continue
             # If the neighbor has already been visited and is part of the MST, add it as possible edge
-            if neighbor in visited:
+            if visited[neighbor]:
                 candidates.append(neighbor)
+                candidate_dirs.append(dir_id)
             # If not, add it as a part of the new fringes, since it will neighbor the MST when the edge is formed
             elif neighbor not in fringes:
-                new_fringes.append(neighbor)
+                fringes.add(neighbor)
 
         # Choose a random candidate from the available ones
-        candidate = rng.choice(candidates)
+        candidate_id = rng.integers(len(candidates))
+        candidate = candidates[candidate_id]
+        dir_id = candidate_dirs[candidate_id]
 
-        # Add the fringe node to the list of visited ones
-        visited.append(fringe)
+        # Add the fringe node to the visited ones and remove it from the fringes
+        visited[fringe] = True
+        fringes.remove(fringe)
 
         # Update the MST with the connections between the two nodes
-        mst[fringe] = nav.set_dir(mst[fringe], adjacency_arr[fringe][candidate])
-        mst[candidate] = nav.set_dir(mst[candidate], adjacency_arr[candidate][fringe])
+        mst[fringe] |= 1 << dir_id
+        mst[candidate] |= 1 << ((dir_id + dir_count // 2) % dir_count)
         edge_order[i, Axis.X] = fringe
         edge_order[i, Axis.Y] = candidate
 
-        # Remove the fringe node from the fringes and add it to the new neighbors that border the MST
-        fringes.remove(fringe)
-        fringes += new_fringes
-        i += 1
+    return (np.array(mst, dtype=np.int8), edge_order)
+
+
+def generate_kruskal_mst(shape, seed=None):
+    '''
+    generate a random spanning tree, using Kruskal's algorithm.
+    The edges are visited in a random order and a union-find keeps track of the connected trees.
+
+    Parameters
+    ----------
+    shape : array
+        node shape HxW of the original grid
+
+    seed : integer, optional
+        used to seed the default rng, by default is none
+
+    Returns
+    -------
+    (mst, edge_order) : tuple
+        a tuple of the generated mst and the order in which the edges were created,
+        the same as the one of generate_prim_mst
+    '''
+    seed_seq = np.random.SeedSequence(entropy=seed)
+    rng = np.random.default_rng(seed_seq)
+    prim_shape = nav.create_pos(shape[Dmn.H] / 2, shape[Dmn.W] / 2)
+    h = int(prim_shape[Dmn.H])
+    w = int(prim_shape[Dmn.W])
+    size = w * h
+
+    # Every edge goes right or down from its start node
+    node_ids = np.arange(size, dtype=np.int64).reshape(h, w)
+    right_starts = node_ids[:, :-1].ravel()
+    down_starts = node_ids[:-1, :].ravel()
+    starts = np.concatenate([right_starts, down_starts])
+    dirs = np.concatenate([np.full(len(right_starts), Dir.Right.value, dtype=np.int64),
+                           np.full(len(down_starts), Dir.Down.value, dtype=np.int64)])
+    ends = np.concatenate([right_starts + 1, down_starts + w])
+    edges = rng.permutation(len(starts))
+
+    # Union-find with path halving, where parents[i] is the parent of node i
+    parents = list(range(size))
+    accepted = []
+    for edge, start, end in zip(edges.tolist(), starts[edges].tolist(), ends[edges].tolist()):
+        if len(accepted) == size - 1:
+            break
+        while parents[start] != start:
+            parents[start] = parents[parents[start]]
+            start = parents[start]
+        while parents[end] != end:
+            parents[end] = parents[parents[end]]
+            end = parents[end]
+        # The edge would create a cycle, since the nodes are already in the same tree
+        if start == end:
+            continue
+        parents[start] = end
+        accepted.append(edge)
+
+    accepted = np.array(accepted, dtype=np.int64)
+    return create_mst(size, starts[accepted], ends[accepted], dirs[accepted])
+
+
+def generate_wilson_mst(shape, seed=None):
+    '''
+    generate a uniform spanning tree, using Wilson's algorithm.
+    Loop-erased random walks are started from the nodes, which aren't yet in the tree, until they hit the tree.
+
+    Parameters
+    ----------
+    shape : array
+        node shape HxW of the original grid
+
+    seed : integer, optional
+        used to seed the default rng, by default is none
+
+    Returns
+    -------
+    (mst, edge_order) : tuple
+        a tuple of the generated mst and the order in which the edges were created,
+        the same as the one of generate_prim_mst
+    '''
+    seed_seq = np.random.SeedSequence(entropy=seed)
+    rng = np.random.default_rng(seed_seq)
+    prim_shape = nav.create_pos(shape[Dmn.H] / 2, shape[Dmn.W] / 2)
+    size = int(prim_shape[Dmn.W] * prim_shape[Dmn.H])
+    neighbors = nav.get_topology(prim_shape).m_neighbor_lists
+    node_dirs = [[dir_id for dir_id, neighbor in enumerate(row) if neighbor >= 0] for row in neighbors]
+
+    in_tree = bytearray(size)
+    in_tree[int(rng.integers(0, size))] = True
+    # The direction each node of the current walk left in. Revisiting a node overwrites it, which erases the loop
+    walk_dirs = [0] * size
+    starts = []
+    ends = []
+    dirs = []
+
+    # The random numbers are drawn in blocks, since the length of the walks isn't known in advance
+    randoms = []
+    random_id = 0
+    for walk_start in rng.permutation(size).tolist():
+        node = walk_start
+        while not in_tree[node]:
+            if random_id == len(randoms):
+                randoms = rng.random(size).tolist()
+                random_id = 0
+            choices = node_dirs[node]
+            walk_dirs[node] = choices[int(randoms[random_id] * len(choices))]
+            random_id += 1
+            node = neighbors[node][walk_dirs[node]]
+
+        # Add the loop-erased walk to the tree
+        node = walk_start
+        while not in_tree[node]:
+            in_tree[node] = True
+            next_node = neighbors[node][walk_dirs[node]]
+            starts.append(node)
+            ends.append(next_node)
+            dirs.append(walk_dirs[node])
+            node = next_node
+
+    return create_mst(size, np.array(starts, dtype=np.int64), np.array(ends, dtype=np.int64),
+                      np.array(dirs, dtype=np.int64))
+
+
+def generate_dfs_mst(shape, seed=None):
+    '''
+    generate a random spanning tree, using an iterative randomized depth-first search.
+    The resulting trees have long corridors with few branches.
+
+    Parameters
+    ----------
+    shape : array
+        node shape HxW of the original grid
+
+    seed : integer, optional
+        used to seed the default rng, by default is none
 
-    return (mst, edge_order)
+    Returns
+    -------
+    (mst, edge_order) : tuple
+        a tuple of the generated mst and the order in which the edges were created,
+        the same as the one of generate_prim_mst
+    '''
+    seed_seq = np.random.SeedSequence(entropy=seed)
+    rng = np.random.default_rng(seed_seq)
+    prim_shape = nav.create_pos(shape[Dmn.H] / 2, shape[Dmn.W] / 2)
+    size = int(prim_shape[Dmn.W] * prim_shape[Dmn.H])
+    neighbors = nav.get_topology(prim_shape).m_neighbor_lists
+
+    start = int(rng.integers(0, size))
+    visited = bytearray(size)
+    visited[start] = True
+    stack = [start]
+    starts = []
+    ends = []
+    dirs = []
+    # Exactly one random number is used for every edge of the tree
+    randoms = rng.random(size).tolist()
+    while len(stack) > 0:
+        node = stack[-1]
+        choices = [dir_id for dir_id, neighbor in enumerate(neighbors[node]) if neighbor >= 0 and not visited[neighbor]]
+        # Backtrack, once the node has no unvisited neighbors
+        if len(choices) == 0:
+            stack.pop()
+            continue
+        dir_id = choices[int(randoms[len(starts)] * len(choices))]
+        next_node = neighbors[node][dir_id]
+        visited[next_node] = True
+        stack.append(next_node)
+        starts.append(node)
+        ends.append(next_node)
+        dirs.append(dir_id)
+
+    return create_mst(size, np.array(starts, dtype=np.int64), np.array(ends, dtype=np.int64),
+                      np.array(dirs, dtype=np.int64))
+
+
+def create_mst(size, starts, ends, dirs):
+    '''
+    create an mst from a list of edges
+
+    Parameters
+    ----------
+    size : integer
+        number of nodes in the mst
+
+    starts : array
+        start node id of every edge in the order in which the edges were created
+
+    ends : array
+        end node id of every edge
+
+    dirs : array
+        direction value from the start to the end node of every edge
+
+    Returns
+    -------
+    (mst, edge_order) : tuple
+        a tuple of the mst and the order in which the edges were created,
+        the same as the one of generate_prim_mst
+    '''
+    dir_count = len(Dir)
+    mst = np.zeros(shape=size, dtype=np.int64)
+    np.bitwise_or.at(mst, starts, 1 << dirs)
+    np.bitwise_or.at(mst, ends, 1 << ((dirs + dir_count // 2) % dir_count))
+    edge_order = np.zeros(shape=(len(starts), Axis.COUNT), dtype=np.int64)
+    edge_order[:, Axis.X] = starts
+    edge_order[:, Axis.Y] = ends
+    return (mst.astype(np.int8), edge_order)
+
+
+mst_generators = {
+    MstAlgo.PRIM: generate_prim_mst,
+    MstAlgo.KRUSKAL: generate_kruskal_mst,
+    MstAlgo.WILSON: generate_wilson_mst,
+    MstAlgo.DFS: generate_dfs_mst,
+}
+'''
+mst_generators - registry of the spanning tree generators, used by generate_mst.
+Every generator is called with (shape, seed) and returns an (mst, edge_order) tuple
+'''
+
+
+def generate_mst(shape, seed=None, mst_algo=MstAlgo.PRIM):
+    '''
+    generate a spanning tree with the specified algorithm from the mst_generators registry
+
+    Parameters
+    ----------
+    shape : array
+        node shape HxW of the original grid
+
+    seed : integer, optional
+        used to seed the default rng, by default is none
+
+    mst_algo : MstAlgo, optional
+        spanning tree algorithm, by default is MstAlgo.PRIM
+
+    Returns
+    -------
+    (mst, edge_order) : tuple
+        a tuple of the generated mst and the order in which the edges were created
+
+    Raises
+    ------
+    ValueError
+        if there is no generator for mst_algo
+    '''
+    if mst_algo not in mst_generators:
+        raise ValueError(f'failed to generate mst! unknown mst_algo: {mst_algo}')
+    return mst_generators[mst_algo](shape, seed)
 
 
 def generate_hamilton_cycle(mst, shape):
@@ -174,6 +906,8 @@ def generate_hamilton_cycle(mst, shape):
     if len(hamilton_cycle) % 2 != 0:
         raise ValueError(f'failed to generate_hamilton_cycle! shape: {shape} is not even in any dimension!')
 
+    half_topology = nav.get_topology(shape / 2)
+
     def can_go(dir, pos):
         '''
         query whether we can move from the current position in the desired direction
@@ -191,7 +925,7 @@ def generate_hamilton_cycle(mst, shape):
         bool
             True, if we can go from the current position in the desired direction
         '''
-        node_id = nav.get_node_id(pos, shape / 2)
+        node_id = half_topology.get_node_id(pos[Axis.X], pos[Axis.Y])
         if node_id >= mst.size:
             return False
         return nav.is_dir(mst[node_id], dir)
@@ -229,6 +963,87 @@ def generate_hamilton_cycle(mst, shape):
     return hamilton_cycle
 
 
+def generate_hamilton_cycle_vectorized(mst, shape):
+    '''
+    generate a hamiltonian cycle from the specified mst with array operations.
+    The result is the same as the one of generate_hamilton_cycle.
+
+    Every node of the grid is a corner of the 2x2 square of an mst node. The cycle goes
+    clockwise around the squares, so every corner leaves its square along the next side.
+    If the mst has an edge through that side, the corner crosses into the neighbor square instead.
+
+    Parameters
+    ----------
+    mst : array
+        mininum spanning tree from which to construct the hamiltonian cycle
+
+    shape : array
+        node shape HxW - number of nodes in the height and width dimensions
+
+    Returns
+    -------
+    array
+        array which is the hamiltonian cycle from the specified mst. The values are indices in the path
+
+    Raises
+    ------
+    ValueError
+        if neither of the shape's dimensions is even
+    '''
+    size = np.int64(shape[Dmn.W] * shape[Dmn.H])
+    if size % 2 != 0:
+        raise ValueError(f'failed to generate_hamilton_cycle_vectorized! shape: {shape} is not even in any dimension!')
+
+    w = np.int64(shape[Dmn.W])
+    node_ids = np.arange(size, dtype=np.int64)
+    xs = node_ids % w
+    ys = node_ids // w
+    prim_ids = (ys // 2) * (w // 2) + xs // 2
+
+    # Corners in clockwise order are top-left, top-right, bottom-right and bottom-left.
+    # The value of a corner is the same as the direction of the side it leaves along.
+    corners = np.where(ys % 2 == 0, xs % 2, 3 - xs % 2)
+    is_crossing = (mst[prim_ids].astype(np.int64) >> corners) & 1 == 1
+    dirs = np.where(is_crossing, corners, (corners + 1) % len(Dir))
+    offsets = np.array([-w, 1, w, -1], dtype=np.int64)
+    successors = node_ids + offsets[dirs]
+
+    # generate_hamilton_cycle starts from the bottom-left corner of the first square,
+    # if the square has a downward edge, otherwise from the bottom-right one
+    start = w if nav.is_dir(mst[0], Dir.Down) else w + 1
+    return rank_cycle(successors, start)
+
+
+def rank_cycle(successors, start):
+    '''
+    compute the position of every node in a cycle, using pointer jumping
+
+    Parameters
+    ----------
+    successors : array
+        the indices are node ids and the values are the ids of the next nodes in the cycle
+
+    start : integer
+        id of the node at position 0
+
+    Returns
+    -------
+    array
+        array, where the indices are node ids and the values are their positions in the cycle
+    '''
+    size = len(successors)
+    # distances[i] is the number of steps from node i to next_nodes[i].
+    # start is absorbing, so once every node jumps to it, the distances are the steps to start
+    next_nodes = successors.copy()
+    next_nodes[start] = start
+    distances = np.ones(shape=size, dtype=np.int64)
+    distances[start] = 0
+    while np.any(next_nodes != start):
+        distances += distances[next_nodes]
+        next_nodes = next_nodes[next_nodes]
+    return (size - distances) % size
+
+
 def find_next_dir(pos, dir: Dir, can_go):
     '''
     find the next direction we can go from the current position
@@ -279,7 +1094,7 @@ def set_path_square(path, path_square, pos, shape):
     shape : array
         node shape HxW
     '''
-    node_id = nav.get_node_id(pos, shape)
+    node_id = nav.get_topology(shape).get_node_id(pos[Axis.X], pos[Axis.Y])
     if (path[node_id] == 0):
         path[node_id] = path_square
 
@@ -367,7 +1182,8 @@ def generate_path_with_odd_dimension(shape):
     '''
     w = shape[Dmn.W]
     h = shape[Dmn.H]
-    get_id = lambda x=0, y=0: nav.get_node_id(nav.create_pos(x, y), shape)
+    topology = nav.get_topology(shape)
+    get_id = topology.get_node_id
 
     path = np.zeros(shape=w * h, dtype=np.int64)
     turning_points = {}
@@ -377,13 +1193,12 @@ def generate_path_with_odd_dimension(shape):
         turning_points = get_turning_points_odd_w(w, h, get_id)
 
     dir = Dir.Right
-    pos = nav.create_pos()
+    curr_id = 0
     for i in range(len(path)):
-        curr_id = nav.get_node_id(pos, shape)
         path[curr_id] = i
         curr_dir = turning_points.get(curr_id)
         if curr_dir is not None:
             dir = curr_dir
-        pos = nav.get_next_pos(pos, dir)
+        curr_id = topology.get_neighbor(curr_id, dir)
 
     return path
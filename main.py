@@ -3,7 +3,9 @@
 from game import SnakeGame
 import arcade
 import snake
+import hamilton_cycle_generator as hcg
 from move_algo import Algo
+from draw_utils import RenderMode
 
 SCREEN_TITLE = "Traveling Snake"
 
@@ -11,28 +13,45 @@ SCREEN_TITLE = "Traveling Snake"
 NODE_SIZE = 30  # size of a node square in pixels
 NODE_SHAPE = [16, 16]  # HxW - number of nodes in the height and width dimensions
 FPS = 120  # application framerate
+STEPS_PER_SECOND = None  # logic steps per second, independent of FPS, None makes a step per frame. +/- change it at runtime
+IS_TURBO = False  # whether to make as many steps as fit in a frame. T toggles it at runtime
 ALGO = Algo.TAKE_SHORTCUTS  # algorithm type the snake should follow, Algo.NONE means normal gameplay
 SEED = 7  # seed for rng
 IS_SHOW_PATH = False  # whether to show the hamilton path in a grid
 IS_PAUSE_UPDATE = False  # whether to pause the update loop
 IS_DRAW_FLAT_PATH = False  # whether to display the flat hamiltonian path below the grid
+RENDER_MODE = RenderMode.SHAPES  # backend, which draws the snake, RenderMode.SPRITES draws it in a single batch, RenderMode.RASTER is for boards with hundreds of nodes per side
+MAX_WINDOW_SIZE = None  # (width, height) maximum window size of RenderMode.RASTER, None fits the window to the display
+IS_COLOR_PATH = False  # whether RenderMode.RASTER colors the free nodes by their order in the hamiltonian path
+PATH_CACHE_DIR = 'data/path_cache'  # directory where the generated hamiltonian paths are cached, None disables it
+OVERLAY_CACHE_DIR = 'data/overlay_cache'  # directory where the labeled path grids are cached, None disables it
 
 SIM_MODE = False  # run simulation using the provided parameters
 SIM_PARAMS = {
     "seed_count": 10,
     "games_per_seed": 10,
-    "node_shapes": [[6, 6], [17, 14]]
+    "node_shapes": [[6, 6], [17, 14]],
+    "is_legacy_food": False,  # True reproduces the food sequence of the saved data/simulation.json
+    "mst_algo": hcg.MstAlgo.PRIM  # spanning tree algorithm, which guides the hamiltonian paths
 }
+SIM_SAVE_PATH = 'data/simulation.jsonl'  # .jsonl streams every game to disk, .json saves all games at the end
+SIM_WORKERS = 1  # number of worker processes for the simulation, None uses all available cores
+SIM_BATCH_SIZE = 1  # number of games advanced in lockstep, 1 runs every game separately, None batches all of them
+SIM_RESUME = False  # whether to skip the games, which are already saved in SIM_SAVE_PATH by an interrupted simulation
 
 def main():
     """ Main function """
+    hcg.configure_path_cache(cache_dir=PATH_CACHE_DIR)
     if not SIM_MODE:
         snake_game = SnakeGame(SCREEN_TITLE, FPS, NODE_SHAPE, NODE_SIZE, ALGO, SEED, IS_SHOW_PATH,
-                               IS_PAUSE_UPDATE, IS_DRAW_FLAT_PATH)
+                               IS_PAUSE_UPDATE, IS_DRAW_FLAT_PATH, render_mode=RENDER_MODE,
+                               overlay_cache_dir=OVERLAY_CACHE_DIR, is_color_path=IS_COLOR_PATH,
+                               steps_per_second=STEPS_PER_SECOND, is_turbo=IS_TURBO,
+                               max_window_size=MAX_WINDOW_SIZE)
         snake_game.setup()
         arcade.run()
     else:
-        snake.run_simulation(SIM_PARAMS, 'data/simulation.json')
+        snake.run_simulation(SIM_PARAMS, SIM_SAVE_PATH, SIM_WORKERS, SIM_BATCH_SIZE, SIM_RESUME)
 
 
 if __name__ == "__main__":
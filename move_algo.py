@@ -2,7 +2,8 @@ import numpy as np
 from enum import IntEnum
 
 import nav
-from nav import Axis, Dmn, Dir
+from nav import Dmn, Dir
+import hamilton_cycle_generator as hcg
 
 
 class Algo(IntEnum):
@@ -12,51 +13,170 @@ class Algo(IntEnum):
     NONE = 2
 
 
-directions = None
-'''
-directions - path directions for Algo.FOLLOW_PATH
-'''
-
-dir_index = np.int64(0)
-'''
-dir_index - current index in the directions array for Algo.FOLLOW_PATH
-'''
+class FollowPathPlanner:
+    '''
+    Per-game state of Algo.FOLLOW_PATH. It owns the directions of its path,
+    so any number of games can follow their paths in the same process.
+    '''
 
+    def __init__(self, path_tables, shape):
+        '''
+        initialize the FollowPathPlanner class
+
+        Parameters
+        ----------
+        path_tables : PathTables
+            lookup tables of the hamiltonian path the snake should follow
+
+        shape : array
+            node shape HxW - number of nodes in the height and width dimensions
+        '''
+        self.m_path_tables = path_tables
+        self.m_shape = shape
+        self.m_directions = create_path_directions(path_tables.m_orders, shape, path_tables)
+        self.m_dir_index = 0
+
+    def reset(self, snake_head):
+        '''
+        continue the path from the head of a new snake
+
+        Parameters
+        ----------
+        snake_head : integer
+            snake head node id
+        '''
+        self.m_dir_index = int(self.m_path_tables.m_orders[snake_head])
+
+    def next_dir(self, snake, food):
+        '''
+        find the next direction in the path
+
+        Parameters
+        ----------
+        snake : SnakeBody
+            contains all node ids occupied by the snake
+
+        food : integer
+            food node id
+
+        Returns
+        -------
+        integer
+            code of the next direction in the path the snake should go
+        '''
+        dir = self.m_directions[self.m_dir_index]
+        self.m_dir_index = (self.m_dir_index + 1) % len(self.m_directions)
+        return dir
+
+
+class ShortcutPlanner:
+    '''
+    Per-game state of Algo.TAKE_SHORTCUTS. It owns the lookup tables of its path,
+    so any number of games can take shortcuts in the same process.
+    '''
 
-def find_next_dir(path, shape):
+    def __init__(self, path_tables, shape):
+        '''
+        initialize the ShortcutPlanner class
+
+        Parameters
+        ----------
+        path_tables : PathTables
+            lookup tables of the hamiltonian path the snake should follow
+
+        shape : array
+            node shape HxW - number of nodes in the height and width dimensions
+        '''
+        self.m_path_tables = path_tables
+        self.m_shape = shape
+
+    def reset(self, snake_head):
+        '''
+        start a new snake. The shortcuts only depend on the current state of the game,
+        so there is nothing to reset
+
+        Parameters
+        ----------
+        snake_head : integer
+            snake head node id
+        '''
+        pass
+
+    def next_dir(self, snake, food):
+        '''
+        find the next direction with find_next_shortcut_dir
+
+        Parameters
+        ----------
+        snake : SnakeBody
+            contains all node ids occupied by the snake
+
+        food : integer
+            food node id
+
+        Returns
+        -------
+        integer
+            code of the next direction the snake should take.
+            If no direction was found, None is returned
+        '''
+        return find_next_shortcut_dir(snake, food, self.m_path_tables.m_orders, self.m_shape)
+
+    def count_follow_path_moves(self, snake, food):
+        '''
+        count the moves, in which the snake only follows the path, with count_follow_path_moves
+
+        Parameters
+        ----------
+        snake : SnakeBody
+            contains all node ids occupied by the snake
+
+        food : integer
+            food node id
+
+        Returns
+        -------
+        integer
+            number of moves, in which the snake moves to the next node in the path
+        '''
+        return count_follow_path_moves(snake, food, self.m_path_tables, self.m_shape)
+
+
+def create_planner(algo, path_tables, shape):
     '''
-    generator function, used to find the next direction in the path
+    create the per-game state of an algorithm
 
     Parameters
     ----------
-    path : array
-        Hamiltonian path, used to construct the array of directions the
-        snake should follow
+    algo : Algo
+        algorithm the snake should follow
+
+    path_tables : PathTables
+        lookup tables of the hamiltonian path the snake should follow
 
     shape : array
         node shape HxW - number of nodes in the height and width dimensions
 
     Returns
     -------
-    Dir
-        the next direction in the path the snake should go
+    FollowPathPlanner or ShortcutPlanner
+        the planner of the algorithm. None for Algo.NONE
     '''
-    global directions, dir_index
-    if directions is None:
-        directions = create_path_directions(path, shape)
-    dir = directions[dir_index]
-    dir_index = np.int64((dir_index + 1) % len(directions))
-    return dir
+    if algo is Algo.FOLLOW_PATH:
+        return FollowPathPlanner(path_tables, shape)
+    if algo is Algo.TAKE_SHORTCUTS:
+        return ShortcutPlanner(path_tables, shape)
+    return None
 
 
-def find_next_shortcut_dir(snake, food, path, shape):
+def find_next_shortcut_dir(snake, food, path, shape, is_vectorized=False):
     '''
     find_next_shortcut_dir - find the next direction the snake should take
     so it reaches the food
 
     Parameters
     ----------
-    snake : array
+    snake : SnakeBody
         contains all node ids occupied by the snake
 
     food : integer
@@ -68,19 +188,202 @@ def find_next_shortcut_dir(snake, food, path, shape):
     shape : array
         node shape HxW - number of nodes in the height and width dimensions
 
+    is_vectorized : bool, optional
+        whether to score the four neighbors with find_next_shortcut_dirs, by default is False.
+        The result is the same, but the loop over the neighbors is faster for a single game
+
     Returns
     -------
     integer
-        the next direction the snake should take.
+        code of the next direction the snake should take.
         If no direction was found, None is returned
     '''
     shape_size = np.int64(shape[Dmn.W] * shape[Dmn.H])
     snake_size = len(snake)
-    head_pos = nav.get_node_pos(snake[0], shape)
-    tail = snake[-1]
-    path_node = path[snake[0]]
+    head = snake.head()
+    tail = snake.tail()
+    if is_vectorized:
+        dirs = find_next_shortcut_dirs(np.array([head]), np.array([tail]), np.array([snake_size]), np.array([food]),
+                                       np.asarray(path)[None, :], snake.occupancy()[None, :],
+                                       nav.get_topology(shape).m_neighbors)
+        return None if dirs[0] < 0 else int(dirs[0])
+
+    path_node = path[head]
     food_dist = nav.path_distance(path_node, path[food], shape)
     tail_dist = nav.path_distance(path_node, path[tail], shape)
+    # cutting_amount_available is the maximum amout the snake can cut by
+    cutting_amount_available = get_cutting_amount(food_dist, tail_dist, snake_size, shape_size)
+
+    neighbors = nav.get_topology(shape).m_neighbor_lists[head]
+    first_dir = None
+    best_dir = None
+    best_dist = -1
+    for dir in range(len(neighbors)):
+        next_node_id = neighbors[dir]
+        if next_node_id == nav.WALL or snake.is_occupied(next_node_id):
+            continue
+        if first_dir is None:
+            first_dir = dir
+        dist = nav.path_distance(path_node, path[next_node_id], shape)
+        if (dist <= cutting_amount_available and dist > best_dist):
+            best_dir = dir
+            best_dist = dist
+
+    if best_dist >= 0:
+        return best_dir
+    # No shortcut is available, so take the first free direction
+    return first_dir
+
+
+def find_next_shortcut_dirs(heads, tails, lengths, foods, orders, occupied, neighbors, rows=None):
+    '''
+    vectorized find_next_shortcut_dir, which scores the four neighbors of the heads of many games at once
+
+    Parameters
+    ----------
+    heads : array
+        head node id of every game
+
+    tails : array
+        tail node id of every game
+
+    lengths : array
+        snake length of every game
+
+    foods : array
+        food node id of every game
+
+    orders : array
+        (G, N) array of the hamiltonian paths of the games
+
+    occupied : array
+        (G, N) boolean array of the nodes occupied by the snakes
+
+    neighbors : array
+        (N, 4) neighbor table of nav.GridTopology
+
+    rows : array, optional
+        row of every game in orders and occupied, by default is None, which is one row per game in order.
+        The tables are indexed in place, so a subset of the games doesn't need copies of them
+
+    Returns
+    -------
+    dirs : array
+        the direction code every snake should take next.
+        -1 if the snake has nowhere to go
+    '''
+    shape_size = orders.shape[1]
+    if rows is None:
+        rows = np.arange(len(heads))
+    path_nodes = orders[rows, heads]
+    food_dists = (orders[rows, foods] - path_nodes - 1) % shape_size
+    tail_dists = (orders[rows, tails] - path_nodes - 1) % shape_size
+    cutting_amounts = get_cutting_amounts(food_dists, tail_dists, lengths, shape_size)
+
+    next_nodes = neighbors[heads]
+    is_inside = next_nodes != nav.WALL
+    safe_nodes = np.where(is_inside, next_nodes, 0)
+    can_go = is_inside & ~occupied[rows[:, None], safe_nodes]
+    dists = (orders[rows[:, None], safe_nodes] - path_nodes[:, None] - 1) % shape_size
+    is_shortcut = can_go & (dists <= cutting_amounts[:, None])
+
+    # The farthest shortcut wins and the first direction wins a tie, the same as in find_next_shortcut_dir.
+    # Without a shortcut, the first free direction is taken
+    shortcut_dirs = np.argmax(np.where(is_shortcut, dists, -1), axis=1)
+    first_dirs = np.argmax(can_go, axis=1)
+    dirs = np.where(is_shortcut.any(axis=1), shortcut_dirs, first_dirs)
+    return np.where(can_go.any(axis=1), dirs, -1)
+
+
+def count_follow_path_moves(snake, food, path_tables, shape):
+    '''
+    count the moves find_next_shortcut_dir makes along the path before its next decision point.
+    Those are the moves, in which no shortcut is allowed, the next node in the path is free
+    and isn't the food. The snake can be advanced over them in bulk
+
+    Parameters
+    ----------
+    snake : SnakeBody
+        contains all node ids occupied by the snake
+
+    food : integer
+        food node id
+
+    path_tables : PathTables
+        lookup tables of the hamilton path the snake should follow
+
+    shape : array
+        node shape HxW - number of nodes in the height and width dimensions
+
+    Returns
+    -------
+    integer
+        number of moves, in which find_next_shortcut_dir moves to the next node in the path
+    '''
+    shape_size = len(path_tables)
+    snake_size = len(snake)
+    orders = path_tables.m_orders
+    path_node = orders[snake.head()]
+    food_dist = nav.path_distance(path_node, orders[food], shape)
+    if food_dist == 0 or snake.is_occupied(path_tables.m_successors[snake.head()]):
+        return 0
+    tail_dist = nav.path_distance(path_node, orders[snake.tail()], shape)
+    if get_cutting_amount(food_dist, tail_dist, snake_size, shape_size) > 0:
+        return 0
+
+    # The moves are checked in growing windows, so a short stretch doesn't cost a long one
+    count = 1
+    window = 16
+    while count < food_dist:
+        moves = np.arange(count, min(count + window, food_dist), dtype=np.int64)
+        # The old body nodes, which are removed as tails in the moves so far.
+        # After snake_size moves, the tails are the new heads
+        tails = snake.tail_nodes(min(moves[-1] + 1, snake_size))
+        heads = path_node + moves
+        next_nodes = path_tables.m_nodes[(heads + 1) % shape_size]
+
+        # The next node is blocked, if it's in the old body and isn't yet removed as a tail
+        tail_order = np.argsort(tails)
+        tail_ids = np.minimum(np.searchsorted(tails[tail_order], next_nodes), len(tails) - 1)
+        is_removed = (tails[tail_order][tail_ids] == next_nodes) & (tail_order[tail_ids] < moves)
+        is_blocked = snake.occupancy()[next_nodes] & ~is_removed
+
+        curr_tail_orders = np.where(moves < snake_size, orders[tails[np.minimum(moves, len(tails) - 1)]],
+                                    (heads - snake_size + 1) % shape_size)
+        tail_dists = (curr_tail_orders - heads % shape_size - 1) % shape_size
+        cutting_amounts = get_cutting_amounts(food_dist - moves, tail_dists, snake_size, shape_size)
+
+        stops = np.flatnonzero(is_blocked | (cutting_amounts > 0))
+        if len(stops) > 0:
+            return int(moves[stops[0]])
+        count = int(moves[-1]) + 1
+        window *= 2
+    return count
+
+
+def get_cutting_amount(food_dist, tail_dist, snake_size, shape_size):
+    '''
+    retrieve the maximum amount by which the snake can cut the path
+
+    Parameters
+    ----------
+    food_dist : integer
+        path distance from the head to the food
+
+    tail_dist : integer
+        path distance from the head to the tail
+
+    snake_size : integer
+        length of the snake
+
+    shape_size : integer
+        number of nodes on the board
+
+    Returns
+    -------
+    integer
+        the maximum path distance of the next node, 0 means the snake follows the path
+    '''
     cutting_amount_available = tail_dist - snake_size - 3  # allow a small buffer
     empty_nodes = shape_size - snake_size  # account for food
 
@@ -100,44 +403,46 @@ def find_next_shortcut_dir(snake, food, path, shape):
         cutting_amount_available = cutting_amount_desired
     if cutting_amount_available < 0:
         cutting_amount_available = 0
+    return cutting_amount_available
 
-    # cutting_amount_available is now the maximum amout the snake can cut by
 
-    def can_go(dir: Dir):
-        next = nav.get_next_pos(head_pos, dir)
-        if nav.is_out_of_bounds(next, shape):
-            return False
-        next_node_id = nav.get_node_id(next, shape)
-        if next_node_id in snake:
-            return False
-        return True
+def get_cutting_amounts(food_dists, tail_dists, snake_sizes, shape_size):
+    '''
+    vectorized get_cutting_amount
 
-    dir_array = nav.get_dir_array()
-    can_go_arr = np.zeros(len(dir_array), dtype=bool)
-    best_dir = None
-    best_dist = -1
-    for i in range(len(dir_array)):
-        dir = dir_array[i]
-        can_go_arr[i] = can_go(dir)
-        if can_go_arr[i]:
-            next_node = nav.get_next_pos(head_pos, dir)
-            next_node_id = nav.get_node_id(next_node, shape)
-            dist = nav.path_distance(path_node, path[next_node_id], shape)
-            if (dist <= cutting_amount_available and dist > best_dist):
-                best_dir = dir
-                best_dist = dist
+    Parameters
+    ----------
+    food_dists : array
+        path distances from the heads to the foods
 
-    if best_dist >= 0:
-        return best_dir
+    tail_dists : array
+        path distances from the heads to the tails
 
-    for dir in dir_array:
-        if can_go(dir):
-            return dir
-    return None
+    snake_sizes : array
+        lengths of the snakes
+
+    shape_size : integer
+        number of nodes on the board
+
+    Returns
+    -------
+    array
+        the maximum path distances of the next nodes
+    '''
+    cutting_amounts = tail_dists - snake_sizes - 3
+    empty_nodes = shape_size - snake_sizes
+
+    is_eating_first = food_dists < tail_dists
+    cutting_amounts = np.where(is_eating_first, cutting_amounts - 1, cutting_amounts)
+    cutting_amounts = np.where(is_eating_first & ((tail_dists - food_dists) * 4 > empty_nodes),
+                               cutting_amounts - 10, cutting_amounts)
+    cutting_amounts = np.where(empty_nodes < shape_size / 2, 0, cutting_amounts)
+    cutting_amounts = np.minimum(cutting_amounts, food_dists)
+    return np.maximum(cutting_amounts, 0)
 
 
 # Utility functions
-def create_path_directions(path, shape):
+def create_path_directions(path, shape, path_tables=None):
     '''
     create an array of directions the snake should follow
 
@@ -148,43 +453,24 @@ def create_path_directions(path, shape):
     shape : array
         node shape HxW - number of nodes in the height and width dimensions
 
+    path_tables : PathTables, optional
+        lookup tables of the path, by default is None, which builds them from path
+
     Returns
     -------
     path_directions : array
-        an array of path directions the snake should follow
-    '''
-    path_directions = np.zeros(shape=len(path), dtype=Dir)
-
-    def get_node_id(val):
-        return np.where(path == val)[0][0]
-
-    initial_id = get_node_id(0)
-    prev_node_id = initial_id
-    for i in range(1, len(path)):
-        node_id = get_node_id(i)
-        dir = nav.get_dir_between(prev_node_id, node_id, shape)
-        if dir is not None:
-            path_directions[i - 1] = dir
-        prev_node_id = node_id
-    dir = nav.get_dir_between(prev_node_id, initial_id, shape)
-    if dir is not None:
-        path_directions[-1] = dir
-    return path_directions
-
-
-def set_path_dir_index(snake_head, path):
-    '''
-    set the path direction index based on the head of the snake.
-    Reset directions to None
-
-    Parameters
-    ----------
-    snake_head : integer
-        snake head node id
-
-    path : array
-        Hamiltonian path the snake should follow
+        an array of path direction codes the snake should follow.
+        The indices are path orders, the values are the codes of the directions to the next node
     '''
-    global directions, dir_index
-    dir_index = path[snake_head]
-    directions = None
+    if path_tables is None:
+        path_tables = hcg.PathTables(path)
+    # The same as nav.get_dir_between for every node and its successor in the path
+    w = np.int64(shape[Dmn.W])
+    nodes = path_tables.m_nodes
+    next_nodes = path_tables.m_successors[nodes]
+    x_steps = next_nodes % w - nodes % w
+    y_steps = next_nodes // w - nodes // w
+    path_directions = np.where(x_steps != 0,
+                               np.where(x_steps > 0, Dir.Right.value, Dir.Left.value),
+                               np.where(y_steps > 0, Dir.Down.value, Dir.Up.value))
+    return path_directions.astype(nav.DIR_CODE_DTYPE)
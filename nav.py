@@ -1,5 +1,6 @@
 import numpy as np
 from enum import Enum, IntEnum
+from functools import lru_cache
 
 
 class Axis(IntEnum):
@@ -36,6 +37,320 @@ class Dir(Enum):
     ''' Left direction '''
 
 
+WALL = -1
+'''
+WALL - sentinel in the neighbor tables for neighbors outside the bounds of the grid
+'''
+
+DIR_CODE_DTYPE = np.uint8
+'''
+DIR_CODE_DTYPE - type of the integer direction codes. The code of a direction is its Dir value
+'''
+
+DIRS = np.array(Dir)
+'''
+DIRS - directions, where the indices are direction codes
+'''
+
+DIR_OFFSETS = np.array([[0, -1], [1, 0], [0, 1], [-1, 0]], dtype=np.int64)
+'''
+DIR_OFFSETS - x, y position offsets, where the indices are direction codes
+'''
+
+DIR_OPPOSITES = np.array([2, 3, 0, 1], dtype=DIR_CODE_DTYPE)
+'''
+DIR_OPPOSITES - codes of the opposite directions, where the indices are direction codes
+'''
+
+DIR_LEFT_TURNS = np.array([3, 0, 1, 2], dtype=DIR_CODE_DTYPE)
+'''
+DIR_LEFT_TURNS - codes of the directions after a left turn, where the indices are direction codes
+'''
+
+DIR_RIGHT_TURNS = np.array([1, 2, 3, 0], dtype=DIR_CODE_DTYPE)
+'''
+DIR_RIGHT_TURNS - codes of the directions after a right turn, where the indices are direction codes
+'''
+
+for table in [DIRS, DIR_OFFSETS, DIR_OPPOSITES, DIR_LEFT_TURNS, DIR_RIGHT_TURNS]:
+    table.setflags(write=False)
+
+
+class GridTopology:
+    '''
+    Precomputed topology of a node grid. It's created once per shape by get_topology,
+    so neighbor lookups don't allocate position arrays.
+    '''
+
+    def __init__(self, shape):
+        '''
+        initialize the GridTopology class
+
+        Parameters
+        ----------
+        shape : array
+            node shape HxW - number of nodes in the height and width dimensions
+        '''
+        h = int(shape[Dmn.H])
+        w = int(shape[Dmn.W])
+        ids = np.arange(h * w, dtype=np.int64)
+        xs = ids % w
+        ys = ids // w
+        neighbors = np.full(shape=(h * w, len(Dir)), fill_value=WALL, dtype=np.int64)
+        neighbors[:, Dir.Up.value] = np.where(ys > 0, ids - w, WALL)
+        neighbors[:, Dir.Right.value] = np.where(xs < w - 1, ids + 1, WALL)
+        neighbors[:, Dir.Down.value] = np.where(ys < h - 1, ids + w, WALL)
+        neighbors[:, Dir.Left.value] = np.where(xs > 0, ids - 1, WALL)
+        for table in [xs, ys, neighbors]:
+            table.setflags(write=False)
+
+        self.m_h = h
+        self.m_w = w
+        self.m_size = h * w
+        self.m_xs = xs
+        self.m_ys = ys
+        self.m_neighbors = neighbors
+        self.m_neighbor_lists = neighbors.tolist()
+
+    def get_neighbor(self, node_id, dir):
+        '''
+        retrieve the neighbor of a node
+
+        Parameters
+        ----------
+        node_id : integer
+            id of the node
+
+        dir : Dir or integer
+            direction or direction code of the neighbor
+
+        Returns
+        -------
+        integer
+            id of the neighbor node, WALL if it's outside the bounds of the grid
+
+        Raises
+        ------
+        TypeError
+            if dir isn't a Dir or a direction code
+        '''
+        return self.m_neighbor_lists[node_id][to_dir_code(dir)]
+
+    def get_node_pos(self, node_id):
+        '''
+        retrieve the position of the specified node
+
+        Parameters
+        ----------
+        node_id : integer
+            id of the node
+
+        Returns
+        -------
+        array
+            an array of x, y node position in the grid
+        '''
+        return create_pos(self.m_xs[node_id], self.m_ys[node_id])
+
+    def get_node_id(self, x=0, y=0):
+        '''
+        retrieve the id of the node at the specified position
+
+        Parameters
+        ----------
+        x : integer, optional
+            x component, default value is 0
+
+        y : integer, optional
+            y component, default value is 0
+
+        Returns
+        -------
+        node_id : integer
+            the id of the node at the specified position.
+            If the position is out of the bounds of the grid, None is returned
+        '''
+        if self.is_out_of_bounds(x, y):
+            return None
+        return np.int64(x + y * self.m_w)
+
+    def is_out_of_bounds(self, x, y):
+        '''
+        query whether the position is out of the bounds of the grid
+
+        Parameters
+        ----------
+        x : integer
+            x component
+
+        y : integer
+            y component
+
+        Returns
+        -------
+        bool
+            true, if the position is out of the bounds of the grid, false otherwise
+        '''
+        return x < 0 or y < 0 or x >= self.m_w or y >= self.m_h
+
+    def get_dir_between(self, start, end):
+        '''
+        retrieve the direction between two nodes
+
+        Parameters
+        ----------
+        start : integer
+            start node id
+
+        end : integer
+            end node id
+
+        Returns
+        -------
+        dir : Dir
+            the direction between start and end, if found.
+            Otherwise return None
+        '''
+        x_step = self.m_xs[end] - self.m_xs[start]
+        if x_step != 0:
+            return Dir.Right if x_step > 0 else Dir.Left
+        y_step = self.m_ys[end] - self.m_ys[start]
+        if y_step != 0:
+            return Dir.Down if y_step > 0 else Dir.Up
+        return None
+
+
+@lru_cache(maxsize=32)
+def create_topology(h, w):
+    '''
+    create the topology of a grid. The topologies are cached, so every shape is created once
+
+    Parameters
+    ----------
+    h : integer
+        number of nodes in the height dimension
+
+    w : integer
+        number of nodes in the width dimension
+
+    Returns
+    -------
+    GridTopology
+        the topology of the grid
+    '''
+    return GridTopology(create_pos(h, w))
+
+
+def get_topology(shape):
+    '''
+    retrieve the cached topology of a grid
+
+    Parameters
+    ----------
+    shape : array
+        node shape HxW - number of nodes in the height and width dimensions
+
+    Returns
+    -------
+    GridTopology
+        the topology of the grid
+    '''
+    return create_topology(int(shape[Dmn.H]), int(shape[Dmn.W]))
+
+
+def to_dir_code(dir):
+    '''
+    convert a direction to its integer code
+
+    Parameters
+    ----------
+    dir : Dir or integer
+        direction or direction code
+
+    Returns
+    -------
+    integer
+        the direction code
+
+    Raises
+    ------
+    TypeError
+        if dir isn't a Dir or a direction code
+    '''
+    if isinstance(dir, Dir):
+        return dir.value
+    if isinstance(dir, (int, np.integer)) and not isinstance(dir, bool) and 0 <= dir < len(DIRS):
+        return int(dir)
+    raise TypeError(f'dir: {dir} isn\'t of type Dir or a direction code')
+
+
+def to_dir(dir):
+    '''
+    convert a direction code to a Dir
+
+    Parameters
+    ----------
+    dir : Dir or integer
+        direction or direction code
+
+    Returns
+    -------
+    Dir
+        the direction
+
+    Raises
+    ------
+    TypeError
+        if dir isn't a Dir or a direction code
+    '''
+    return DIRS[to_dir_code(dir)]
+
+
+def to_dir_codes(dirs):
+    '''
+    convert an array of directions to direction codes
+
+    Parameters
+    ----------
+    dirs : array
+        directions or direction codes
+
+    Returns
+    -------
+    array
+        an array of DIR_CODE_DTYPE direction codes with the same shape as dirs
+
+    Raises
+    ------
+    TypeError
+        if any of the dirs isn't a Dir or a direction code
+    '''
+    dirs = np.asarray(dirs)
+    if dirs.dtype != object:
+        if dirs.size > 0 and (dirs.min() < 0 or dirs.max() >= len(DIRS)):
+            raise TypeError(f'dirs: {dirs} contain invalid direction codes')
+        return dirs.astype(DIR_CODE_DTYPE)
+    codes = np.array([to_dir_code(dir) for dir in dirs.ravel()], dtype=DIR_CODE_DTYPE)
+    return codes.reshape(dirs.shape)
+
+
+def to_dirs(codes):
+    '''
+    convert an array of direction codes to directions
+
+    Parameters
+    ----------
+    codes : array
+        direction codes
+
+    Returns
+    -------
+    array
+        an array of Dir with the same shape as codes
+    '''
+    return DIRS[to_dir_codes(codes)]
+
+
 def get_next_pos(pos, dir: Dir):
     '''
     move from the current position in the specified direction
@@ -62,13 +377,7 @@ def get_next_pos(pos, dir: Dir):
         raise TypeError("pos is not array type")
     if not isinstance(dir, Dir):
         raise TypeError("dir is not type Dir")
-    offsets = {
-        Dir.Up: create_pos(y=-1),
-        Dir.Right: create_pos(x=1),
-        Dir.Down: create_pos(y=1),
-        Dir.Left: create_pos(x=-1)
-    }
-    next_pos = pos + offsets.get(dir, create_pos())
+    next_pos = pos + DIR_OFFSETS[dir.value]
     return next_pos
 
 
@@ -150,8 +459,7 @@ def get_dir_array(start: Dir = Dir.Up, offset=0):
     '''
     if not isinstance(start, Dir):
         raise TypeError("start is not type Dir")
-    dir_array = np.array(Dir)
-    dir_array = np.roll(dir_array, -start.value + offset)
+    dir_array = np.roll(DIRS, -start.value + offset)
     return dir_array
 
 
@@ -192,9 +500,7 @@ def get_node_pos(id, shape):
     array
         an of x, y node position in the shape grid
     '''
-    x = np.int64(id % shape[Dmn.W])
-    y = np.int64(id / shape[Dmn.W])
-    return create_pos(x, y)
+    return get_topology(shape).get_node_pos(id)
 
 
 def get_node_id(pos, shape):
@@ -215,11 +521,7 @@ def get_node_id(pos, shape):
         the id of the node at the specified position
         If pos is out of the bounds of shape, None is returned
     '''
-    if is_out_of_bounds(pos, shape):
-        return None
-
-    node_id = np.int64(pos[Axis.X] + pos[Axis.Y] * shape[Dmn.W])
-    return node_id
+    return get_topology(shape).get_node_id(pos[Axis.X], pos[Axis.Y])
 
 
 def get_next_node_id(node_id, dir, shape):
@@ -243,10 +545,8 @@ def get_next_node_id(node_id, dir, shape):
         the next node id in the direction of the current one
         If next_pos is out of the bounds of shape, None is returned
     '''
-    curr_pos = get_node_pos(node_id, shape)
-    next_pos = get_next_pos(curr_pos, dir)
-    next_node_id = get_node_id(next_pos, shape)
-    return next_node_id
+    next_node_id = get_topology(shape).get_neighbor(node_id, dir)
+    return None if next_node_id == WALL else next_node_id
 
 
 def get_dir_between(start, end, node_shape):
@@ -269,15 +569,7 @@ def get_dir_between(start, end, node_shape):
         the direction between start and end, if found.
         Otherwise return None
     '''
-    start_pos = get_node_pos(start, node_shape)
-    end_pos = get_node_pos(end, node_shape)
-
-    dir = None
-    if start_pos[Axis.X] != end_pos[Axis.X]:
-        dir = Dir.Right if start_pos[Axis.X] - end_pos[Axis.X] < 0 else Dir.Left
-    elif start_pos[Axis.Y] != end_pos[Axis.Y]:
-        dir = Dir.Down if start_pos[Axis.Y] - end_pos[Axis.Y] < 0 else Dir.Up
-    return dir
+    return get_topology(node_shape).get_dir_between(start, end)
 
 
 def path_distance(start_node, end_node, shape):
@@ -322,4 +614,4 @@ def is_out_of_bounds(pos, shape):
     bool
         true, if the position is out of the bounds of shape, false otherwise
     '''
-    return pos[Axis.X] < 0 or pos[Axis.Y] < 0 or pos[Axis.X] >= shape[Dmn.W] or pos[Axis.Y] >= shape[Dmn.H]
+    return get_topology(shape).is_out_of_bounds(pos[Axis.X], pos[Axis.Y])
@@ -0,0 +1,133 @@
+import time
+
+
+MIN_STEPS_PER_SECOND = 1
+'''
+minimum number of logic steps per second of StepScheduler
+'''
+
+MAX_STEPS_PER_SECOND = 1 << 20
+'''
+maximum number of logic steps per second of StepScheduler
+'''
+
+FRAME_BUDGET_FRACTION = 0.8
+'''
+fraction of a frame, which the logic steps may use. The rest is left for rendering
+'''
+
+
+class StepScheduler:
+    '''
+    Fixed-timestep scheduler, which decouples the logic steps from the rendered frames.
+    The elapsed time is accumulated and converted to whole steps at a fixed rate, so the game
+    advances at the same speed regardless of the frame rate. In turbo mode it runs as many steps
+    as fit in the frame budget. Either way it never runs longer than the budget, so rendering
+    keeps its frame rate and a backlog, which can't be caught up, is dropped.
+    '''
+
+    def __init__(self, steps_per_second, frame_time, is_turbo=False):
+        '''
+        initialize the StepScheduler class
+
+        Parameters
+        ----------
+        steps_per_second : float
+            number of logic steps per second, clamped to [MIN_STEPS_PER_SECOND, MAX_STEPS_PER_SECOND]
+
+        frame_time : float
+            duration of a rendered frame in seconds
+
+        is_turbo : bool, optional
+            whether to run as many steps as fit in the frame budget, by default is False
+        '''
+        self.m_steps_per_second = MIN_STEPS_PER_SECOND
+        self.m_frame_budget = frame_time * FRAME_BUDGET_FRACTION
+        self.m_is_turbo = is_turbo
+        self.m_step_time = 0.0
+        self.set_steps_per_second(steps_per_second)
+
+    def set_steps_per_second(self, steps_per_second):
+        '''
+        change the number of logic steps per second
+
+        Parameters
+        ----------
+        steps_per_second : float
+            number of logic steps per second, clamped to [MIN_STEPS_PER_SECOND, MAX_STEPS_PER_SECOND]
+
+        Returns
+        -------
+        float
+            the new number of logic steps per second
+        '''
+        self.m_steps_per_second = min(max(steps_per_second, MIN_STEPS_PER_SECOND), MAX_STEPS_PER_SECOND)
+        return self.m_steps_per_second
+
+    def set_turbo(self, is_turbo):
+        '''
+        turn the turbo mode on or off
+
+        Parameters
+        ----------
+        is_turbo : bool
+            whether to run as many steps as fit in the frame budget
+        '''
+        self.m_is_turbo = is_turbo
+        self.m_step_time = 0.0
+
+    def run(self, delta_time, step_func):
+        '''
+        run the logic steps, which are due in the current frame
+
+        Parameters
+        ----------
+        delta_time : float
+            time in seconds since the last call
+
+        step_func : callable
+            function without arguments, which makes a single logic step
+
+        Returns
+        -------
+        integer
+            number of steps run
+        '''
+        start = time.perf_counter()
+        if self.m_is_turbo:
+            step_count = 0
+            while time.perf_counter() - start < self.m_frame_budget:
+                step_func()
+                step_count += 1
+            return step_count
+
+        self.m_step_time += delta_time
+        step_count = int(self.m_step_time * self.m_steps_per_second)
+        self.m_step_time -= step_count / self.m_steps_per_second
+        for i in range(step_count):
+            if time.perf_counter() - start >= self.m_frame_budget:
+                # The steps don't fit in the frame, so drop the backlog instead of falling further behind
+                self.m_step_time = 0.0
+                return i
+            step_func()
+        return step_count
+
+    m_steps_per_second = MIN_STEPS_PER_SECOND
+    '''
+    m_steps_per_second - number of logic steps per second outside of the turbo mode
+    '''
+
+    m_frame_budget = 0.0
+    '''
+    m_frame_budget - time in seconds, which the steps of a frame may use
+    '''
+
+    m_is_turbo = False
+    '''
+    m_is_turbo - whether to run as many steps as fit in the frame budget
+    '''
+
+    m_step_time = 0.0
+    '''
+    m_step_time - accumulated time in seconds, which isn't converted to steps yet
+    '''
@@ -0,0 +1,526 @@
+import numpy as np
+import json
+import os
+import re
+from enum import IntEnum
+from nav import Dmn
+
+JSONL_EXTENSION = '.jsonl'
+''' extension of the streamed simulation files '''
+
+CHECKPOINT_EXTENSION = '.checkpoint.jsonl'
+''' extension, appended to .json and .sim paths for the checkpoint of an unfinished simulation '''
+
+BINARY_EXTENSION = '.sim'
+''' extension of the binary simulation files '''
+
+BINARY_MAGIC = b'TSNKSIM1'
+''' magic bytes at the start of the binary simulation files '''
+
+BINARY_ALIGNMENT = 8
+''' alignment in bytes of the index table and the moves array in the binary simulation files '''
+
+MOVES_DTYPE = np.dtype('<i4')
+''' type of the moves in the binary simulation files '''
+
+MOVES_KEY_PATTERN = re.compile(r'shape_(\d+)x(\d+)_seed_(\d+)_algo_(\d+)_game_(\d+)')
+''' pattern of the keys in the simulation data '''
+
+LEGACY_PARAMS = {"is_legacy_food": True, "mst_algo": 0}
+''' parameters of the simulations saved before they were recorded, which used snake.create_food and Prim's algorithm '''
+
+
+class IndexCol(IntEnum):
+    ''' Enumerate the columns of the index table of the binary simulation files '''
+    H = 0
+    W = 1
+    SEED = 2
+    ALGO = 3
+    GAME = 4
+    OFFSET = 5
+    LENGTH = 6
+    COUNT = 7
+
+
+def create_moves_key(shape, seed, algo, game):
+    '''
+    create the key of a game in the simulation data
+
+    Parameters
+    ----------
+    shape : array
+        node shape HxW - number of nodes in the height and width dimensions
+
+    seed : integer
+        rng seed of the game
+
+    algo : Algo
+        algorithm of the game
+
+    game : integer
+        index of the game for this seed
+
+    Returns
+    -------
+    string
+        the key of the game
+    '''
+    return f'shape_{shape[Dmn.H]}x{shape[Dmn.W]}_seed_{seed}_algo_{int(algo)}_game_{game}'
+
+
+def parse_moves_key(moves_key):
+    '''
+    parse the key of a game in the simulation data
+
+    Parameters
+    ----------
+    moves_key : string
+        key created by create_moves_key
+
+    Returns
+    -------
+    tuple
+        (h, w, seed, algo, game) tuple of integers
+
+    Raises
+    ------
+    ValueError
+        if moves_key isn't a valid key
+    '''
+    match = MOVES_KEY_PATTERN.fullmatch(moves_key)
+    if match is None:
+        raise ValueError(f'failed to parse moves_key: {moves_key}!')
+    return tuple(int(group) for group in match.groups())
+
+
+class SimulationWriter:
+    '''
+    Streaming writer of simulation results in the JSON Lines format.
+    The first line holds the simulation parameters and every next line
+    is a record of a single finished game, written as soon as it's produced.
+    '''
+
+    def __init__(self, path, params, is_append=False, checkpoint_every=100):
+        '''
+        initialize the SimulationWriter class and write the simulation parameters
+
+        Parameters
+        ----------
+        path : string
+            path of the .jsonl file, in which the results are written
+
+        params : dict
+            simulation parameters
+
+        is_append : bool, optional
+            whether to append to the records of an interrupted simulation, by default is False.
+            An incomplete last line is removed and the parameters aren't written again
+
+        checkpoint_every : integer, optional
+            number of records after which the file is synced to disk, by default is 100
+        '''
+        if is_append:
+            truncate_incomplete_line(path)
+            self.m_file = open(path, "a")
+        else:
+            self.m_file = open(path, "w")
+            self.write_line({"params": params})
+        self.m_checkpoint_every = checkpoint_every
+        self.m_unsynced_count = 0
+
+    def write(self, moves_key, moves):
+        '''
+        write the result of a single game
+
+        Parameters
+        ----------
+        moves_key : string
+            key of the game in the simulation data
+
+        moves : list
+            moves the snake made to eat every piece of food
+        '''
+        self.write_line({"key": moves_key, "moves": moves})
+        self.m_unsynced_count += 1
+        if self.m_unsynced_count >= self.m_checkpoint_every:
+            self.checkpoint()
+
+    def write_line(self, record):
+        '''
+        write a record as a single line and flush it to disk
+
+        Parameters
+        ----------
+        record : dict
+            record to be written
+        '''
+        self.m_file.write(json.dumps(record, separators=(',', ':')))
+        self.m_file.write('\n')
+        self.m_file.flush()
+
+    def checkpoint(self):
+        '''
+        sync the written records to disk, so they survive a system crash
+        '''
+        self.m_file.flush()
+        os.fsync(self.m_file.fileno())
+        self.m_unsynced_count = 0
+
+    def close(self):
+        '''
+        sync and close the underlying file
+        '''
+        self.checkpoint()
+        self.m_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def truncate_incomplete_line(path):
+    '''
+    remove the incomplete last line of a file, left by an interrupted write
+
+    Parameters
+    ----------
+    path : string
+        path of the file to be truncated
+    '''
+    with open(path, "rb+") as file:
+        content = file.read()
+        file.truncate(content.rfind(b'\n') + 1)
+
+
+def read_records(path):
+    '''
+    generator function, which reads the records of a streamed simulation one by one.
+    An incomplete last line, left by an interrupted simulation, is skipped.
+
+    Parameters
+    ----------
+    path : string
+        path of the .jsonl file
+
+    Returns
+    -------
+    record : dict
+        either a {"params"} record or a {"key", "moves"} record
+    '''
+    with open(path, "r") as infile:
+        for line in infile:
+            if not line.endswith('\n'):
+                break
+            yield json.loads(line)
+
+
+def read_games(path, keys):
+    '''
+    read the moves of the specified games from a streamed simulation,
+    without keeping the rest of the games in memory
+
+    Parameters
+    ----------
+    path : string
+        path of the .jsonl file
+
+    keys : set
+        keys of the games to be read
+
+    Returns
+    -------
+    games : dict
+        the moves of the games, which were found in the file, by their keys
+    '''
+    games = {}
+    for record in read_records(path):
+        if record.get("key") in keys:
+            games[record["key"]] = record["moves"]
+    return games
+
+
+def read_simulation(path):
+    '''
+    read simulation results into a {"params", "data"} dictionary
+
+    Parameters
+    ----------
+    path : string
+        path of the simulation. Either a .jsonl file written by SimulationWriter,
+        a binary .sim file written by write_binary or a .json file with the whole dictionary
+
+    Returns
+    -------
+    sim_data : dict
+        dictionary with the simulation parameters in "params" and the moves
+        of every game in "data"
+    '''
+    extension = os.path.splitext(path)[1]
+    if extension == BINARY_EXTENSION:
+        return SimulationStore(path).to_dict()
+    if extension != JSONL_EXTENSION:
+        with open(path, "r") as infile:
+            return json.load(infile)
+
+    sim_data = {"params": {}, "data": {}}
+    for record in read_records(path):
+        if "params" in record:
+            sim_data["params"] = record["params"]
+        else:
+            sim_data["data"][record["key"]] = record["moves"]
+    return sim_data
+
+
+def read_finished_games(path, params, is_keep_moves=True):
+    '''
+    read the games, which were already finished by a simulation with the same parameters
+
+    Parameters
+    ----------
+    path : string
+        path of the simulation. Either a .jsonl file or a checkpoint written by SimulationWriter,
+        a binary .sim file or a .json file
+
+    params : dict
+        parameters of the simulation, which is resumed
+
+    is_keep_moves : bool, optional
+        whether to keep the moves of the finished games, by default is True.
+        If False, only the keys are read and the moves are None
+
+    Returns
+    -------
+    (is_started, finished) : tuple
+        is_started is True, if the parameters of the simulation were found in the file.
+        finished is a dictionary with the keys of the finished games and their moves
+
+    Raises
+    ------
+    ValueError
+        if the simulation in path was created with different parameters
+    '''
+    params = json.loads(json.dumps(params))
+    if os.path.splitext(path)[1] != JSONL_EXTENSION:
+        sim_data = read_simulation(path)
+        records = [{"params": sim_data["params"]}]
+        records += [{"key": moves_key, "moves": moves} for moves_key, moves in sim_data["data"].items()]
+    else:
+        records = read_records(path)
+
+    is_started = False
+    finished = {}
+    for record in records:
+        if "params" in record:
+            if dict(LEGACY_PARAMS, **record["params"]) != params:
+                raise ValueError(f'failed to resume simulation! {path} has different params: {record["params"]}')
+            is_started = True
+        else:
+            finished[record["key"]] = record["moves"] if is_keep_moves else None
+    return is_started, finished
+
+
+class SimulationStore:
+    '''
+    Reader of binary simulation files.
+    The file is memory-mapped, so a single game can be read without parsing the rest.
+
+    Layout of the file:
+    - BINARY_MAGIC
+    - header length - little-endian uint64
+    - header - json with the simulation parameters and the number of games and moves
+    - (G, IndexCol.COUNT) little-endian int64 index table. Every row is a game
+      (h, w, seed, algo, game, offset, length), where offset and length are the slice
+      of the game in the moves array
+    - moves - contiguous MOVES_DTYPE array of the moves of all games
+    The index table and the moves array are aligned to BINARY_ALIGNMENT bytes.
+    '''
+
+    def __init__(self, path):
+        '''
+        initialize the SimulationStore class
+
+        Parameters
+        ----------
+        path : string
+            path of the binary simulation file
+
+        Raises
+        ------
+        ValueError
+            if the file isn't a binary simulation file
+        '''
+        with open(path, "rb") as infile:
+            magic = infile.read(len(BINARY_MAGIC))
+            if magic != BINARY_MAGIC:
+                raise ValueError(f'failed to open simulation store! {path} is not a binary simulation file!')
+            header_length = int(np.frombuffer(infile.read(8), dtype='<u8')[0])
+            header = json.loads(infile.read(header_length).decode('utf-8'))
+
+        self.m_params = header["params"]
+        game_count = header["game_count"]
+        index_offset = align_offset(len(BINARY_MAGIC) + 8 + header_length)
+        moves_offset = align_offset(index_offset + game_count * IndexCol.COUNT * 8)
+        # An empty array can't be memory-mapped
+        self.m_index = np.zeros(shape=(0, IndexCol.COUNT), dtype='<i8')
+        self.m_moves = np.zeros(shape=0, dtype=MOVES_DTYPE)
+        if game_count > 0:
+            self.m_index = np.memmap(path, dtype='<i8', mode='r', offset=index_offset,
+                                     shape=(game_count, IndexCol.COUNT))
+        if header["moves_count"] > 0:
+            self.m_moves = np.memmap(path, dtype=MOVES_DTYPE, mode='r', offset=moves_offset,
+                                     shape=(header["moves_count"],))
+        self.m_rows = {tuple(row[:IndexCol.OFFSET]): i for i, row in enumerate(self.m_index.tolist())}
+
+    def params(self):
+        '''
+        Returns
+        -------
+        dict
+            the simulation parameters
+        '''
+        return self.m_params
+
+    def keys(self):
+        '''
+        Returns
+        -------
+        list
+            keys of all games in the store
+        '''
+        return [create_moves_key((h, w), seed, algo, game) for h, w, seed, algo, game in self.m_rows]
+
+    def get_moves(self, shape, seed, algo, game):
+        '''
+        retrieve the moves of a single game
+
+        Parameters
+        ----------
+        shape : array
+            node shape HxW - number of nodes in the height and width dimensions
+
+        seed : integer
+            rng seed of the game
+
+        algo : Algo
+            algorithm of the game
+
+        game : integer
+            index of the game for this seed
+
+        Returns
+        -------
+        array
+            read-only view of the moves of the game
+
+        Raises
+        ------
+        KeyError
+            if the game isn't in the store
+        '''
+        row = self.m_index[self.m_rows[(int(shape[Dmn.H]), int(shape[Dmn.W]), int(seed), int(algo), int(game))]]
+        return self.m_moves[row[IndexCol.OFFSET]:row[IndexCol.OFFSET] + row[IndexCol.LENGTH]]
+
+    def to_dict(self):
+        '''
+        Returns
+        -------
+        sim_data : dict
+            the whole simulation as a {"params", "data"} dictionary
+        '''
+        data = {}
+        for row in self.m_index.tolist():
+            offset = row[IndexCol.OFFSET]
+            data[create_moves_key(row[:IndexCol.SEED], *row[IndexCol.SEED:IndexCol.OFFSET])] = \
+                self.m_moves[offset:offset + row[IndexCol.LENGTH]].tolist()
+        return {"params": self.m_params, "data": data}
+
+
+def align_offset(offset):
+    '''
+    align a file offset to BINARY_ALIGNMENT bytes
+
+    Parameters
+    ----------
+    offset : integer
+        offset to be aligned
+
+    Returns
+    -------
+    integer
+        the smallest aligned offset, which is not less than offset
+    '''
+    return -(-offset // BINARY_ALIGNMENT) * BINARY_ALIGNMENT
+
+
+def write_binary(sim_data, path):
+    '''
+    write simulation results to a binary simulation file, read by SimulationStore
+
+    Parameters
+    ----------
+    sim_data : dict
+        dictionary with the simulation parameters in "params" and the moves
+        of every game in "data"
+
+    path : string
+        path of the binary simulation file
+    '''
+    data = sim_data["data"]
+    index = np.zeros(shape=(len(data), IndexCol.COUNT), dtype='<i8')
+    offset = 0
+    for i, (moves_key, moves) in enumerate(data.items()):
+        index[i, :IndexCol.OFFSET] = parse_moves_key(moves_key)
+        index[i, IndexCol.OFFSET] = offset
+        index[i, IndexCol.LENGTH] = len(moves)
+        offset += len(moves)
+
+    moves = np.zeros(shape=offset, dtype=MOVES_DTYPE)
+    for i, game_moves in enumerate(data.values()):
+        moves[index[i, IndexCol.OFFSET]:index[i, IndexCol.OFFSET] + index[i, IndexCol.LENGTH]] = game_moves
+
+    header = {"params": sim_data["params"], "game_count": len(data), "moves_count": int(offset)}
+    header_bytes = json.dumps(header, separators=(',', ':')).encode('utf-8')
+    index_offset = align_offset(len(BINARY_MAGIC) + 8 + len(header_bytes))
+    moves_offset = align_offset(index_offset + index.nbytes)
+    with open(path, "wb") as outfile:
+        outfile.write(BINARY_MAGIC)
+        outfile.write(np.array([len(header_bytes)], dtype='<u8').tobytes())
+        outfile.write(header_bytes)
+        outfile.write(bytes(index_offset - outfile.tell()))
+        outfile.write(index.tobytes())
+        outfile.write(bytes(moves_offset - outfile.tell()))
+        outfile.write(moves.tobytes())
+
+
+def json_to_binary(json_path, binary_path):
+    '''
+    convert a .json or .jsonl simulation to a binary simulation file
+
+    Parameters
+    ----------
+    json_path : string
+        path of the .json or .jsonl simulation
+
+    binary_path : string
+        path of the binary simulation file to be written
+    '''
+    write_binary(read_simulation(json_path), binary_path)
+
+
+def binary_to_json(binary_path, json_path):
+    '''
+    convert a binary simulation file to a .json simulation
+
+    Parameters
+    ----------
+    binary_path : string
+        path of the binary simulation file
+
+    json_path : string
+        path of the .json simulation to be written
+    '''
+    json_object = json.dumps(SimulationStore(binary_path).to_dict(), indent=4)
+    with open(json_path, "w") as outfile:
+        outfile.write(json_object)
@@ -1,11 +1,17 @@
 import numpy as np
 from enum import IntEnum
 import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 import nav
-from nav import Axis, Dir, Dmn
+from nav import Dmn
 import move_algo
 from move_algo import Algo
 import hamilton_cycle_generator as hcg
+from hamilton_cycle_generator import MstAlgo
+import batch_snake
+import sim_io
 
 
 class SnakeStatus(IntEnum):
@@ -16,26 +22,428 @@ class SnakeStatus(IntEnum):
     WON = 3
 
 
-def create_empty_snake():
+class SnakeBody:
+    '''
+    Snake body, stored in a preallocated ring buffer of node ids.
+    Index 0 is the head of the snake and index -1 is its tail.
+    An occupancy grid of the board is kept alongside the ring buffer,
+    so membership tests don't depend on the length of the snake.
+    The free nodes are kept in a dense pool with a position index, so
+    a random free node can be picked in constant time.
+    '''
+
+    def __init__(self, capacity, nodes=None):
+        '''
+        initialize the SnakeBody class
+
+        Parameters
+        ----------
+        capacity : integer
+            maximum length of the snake. Node ids must be less than capacity,
+            so it's usually the number of nodes on the board
+
+        nodes : array, optional
+            node ids the snake occupies, starting from the head, by default is None
+        '''
+        self.m_nodes = np.zeros(shape=capacity, dtype=np.int64)
+        self.m_occupied = np.zeros(shape=capacity, dtype=bool)
+        self.m_free = np.arange(capacity, dtype=np.int64)
+        self.m_free_index = np.arange(capacity, dtype=np.int64)
+        self.m_head = 0
+        self.m_length = 0
+        self.m_push_count = 0
+        self.m_generation = 0
+        if nodes is not None:
+            for node in reversed(nodes):
+                self.push_head(node)
+
+    def push_head(self, node):
+        '''
+        push a new head in front of the snake
+
+        Parameters
+        ----------
+        node : integer
+            node id of the new head
+
+        Raises
+        ------
+        IndexError
+            if the snake already fills its capacity
+        '''
+        if self.m_length == len(self.m_nodes):
+            raise IndexError(f'failed to push head {node}! snake body is full')
+        self.m_head = (self.m_head - 1) % len(self.m_nodes)
+        self.m_nodes[self.m_head] = node
+        self.m_occupied[node] = True
+        self.m_length += 1
+        self.m_push_count += 1
+
+        # Swap-remove the node from the free pool
+        index = self.m_free_index[node]
+        last = self.m_free[len(self.m_free) - self.m_length]
+        self.m_free[index] = last
+        self.m_free_index[last] = index
+
+    def pop_tail(self):
+        '''
+        remove the tail of the snake
+
+        Returns
+        -------
+        integer
+            node id of the removed tail
+
+        Raises
+        ------
+        IndexError
+            if the snake is empty
+        '''
+        if self.m_length == 0:
+            raise IndexError('failed to pop tail! snake body is empty')
+        tail = self.tail()
+        self.m_occupied[tail] = False
+        self.m_length -= 1
+
+        # Append the node to the end of the free pool
+        index = len(self.m_free) - self.m_length - 1
+        self.m_free[index] = tail
+        self.m_free_index[tail] = index
+        return tail
+
+    def advance(self, nodes):
+        '''
+        move the snake along the specified nodes without growing.
+        The result is the same as pop_tail followed by push_head for every node,
+        including the order of the free pool, but the nodes are moved with array operations
+
+        Parameters
+        ----------
+        nodes : array
+            distinct node ids of the new heads in the order in which they are entered.
+            Every node must be free before the move, in which it's entered, so there are at most capacity of them
+        '''
+        nodes = np.asarray(nodes, dtype=np.int64)
+        count = len(nodes)
+        if count == 0:
+            return
+        capacity = len(self.m_nodes)
+        length = self.m_length
+
+        # The removed tails are the old body from its tail, followed by the first new heads,
+        # once the whole old body is removed
+        body_count = min(count, length)
+        tails = np.concatenate((self.tail_nodes(body_count), nodes[:count - body_count]))
+
+        # Every removed tail takes the place of the new head in the free pool. A new head, which was
+        # a removed tail of an earlier move, takes that place, so follow those moves back to the first one
+        moves = np.arange(count, dtype=np.int64)
+        earlier_moves = moves.copy()
+        body_ids = np.flatnonzero(self.m_occupied[nodes])
+        if len(body_ids) > 0:
+            body_tails = tails[:body_count]
+            tail_order = np.argsort(body_tails)
+            earlier_moves[body_ids] = tail_order[np.searchsorted(body_tails[tail_order], nodes[body_ids])]
+            while True:
+                next_moves = earlier_moves[earlier_moves]
+                if np.array_equal(next_moves, earlier_moves):
+                    break
+                earlier_moves = next_moves
+        indices = self.m_free_index[nodes[earlier_moves]]
+
+        # Later moves overwrite the places of the earlier ones
+        last_moves = count - 1 - np.unique(indices[::-1], return_index=True)[1]
+        self.m_free[indices[last_moves]] = tails[last_moves]
+        last_moves = count - 1 - np.unique(tails[::-1], return_index=True)[1]
+        self.m_free_index[tails[last_moves]] = indices[last_moves]
+
+        self.m_occupied[tails] = False
+        self.m_occupied[nodes[max(0, count - length):]] = True
+        self.m_nodes[(self.m_head - 1 - moves) % capacity] = nodes
+        self.m_head = (self.m_head - count) % capacity
+        self.m_push_count += count
+
+    def tail_nodes(self, count):
+        '''
+        retrieve the nodes at the end of the snake
+
+        Parameters
+        ----------
+        count : integer
+            number of nodes, must be at most the length of the snake
+
+        Returns
+        -------
+        array
+            node ids of the last count nodes, starting from the tail
+        '''
+        tail_ptrs = (self.m_head + self.m_length - 1 - np.arange(count)) % len(self.m_nodes)
+        return self.m_nodes[tail_ptrs]
+
+    def nodes_at(self, indices):
+        '''
+        retrieve the nodes at the specified indices with a single array lookup
+
+        Parameters
+        ----------
+        indices : array
+            indices in the snake, 0 is the head. They must be less than the length of the snake
+
+        Returns
+        -------
+        array
+            node ids at the indices
+        '''
+        return self.m_nodes[(self.m_head + np.asarray(indices, dtype=np.int64)) % len(self.m_nodes)]
+
+    def head(self):
+        '''
+        Returns
+        -------
+        integer
+            node id of the head
+        '''
+        return self[0]
+
+    def tail(self):
+        '''
+        Returns
+        -------
+        integer
+            node id of the tail
+        '''
+        return self[-1]
+
+    def head_slot(self):
+        '''
+        Returns
+        -------
+        integer
+            position of the head in the ring buffer. A node keeps its position
+            for as long as it's part of the snake, position (head_slot() + i) % capacity() is index i
+        '''
+        return self.m_head
+
+    def capacity(self):
+        '''
+        Returns
+        -------
+        integer
+            maximum length of the snake
+        '''
+        return len(self.m_nodes)
+
+    def push_count(self):
+        '''
+        Returns
+        -------
+        integer
+            number of heads pushed since the snake was created or cleared. The renderers compare it
+            between frames to find how many moves were made
+        '''
+        return self.m_push_count
+
+    def generation(self):
+        '''
+        Returns
+        -------
+        integer
+            number of times the snake was cleared. The ring buffer positions and push_count
+            start over with every generation, so the renderers redraw everything when it changes
+        '''
+        return self.m_generation
+
+    def clear(self):
+        '''
+        remove all nodes from the snake
+        '''
+        self.m_occupied[self.to_array()] = False
+        self.m_free[:] = np.arange(len(self.m_free))
+        self.m_free_index[:] = self.m_free
+        self.m_head = 0
+        self.m_length = 0
+        self.m_push_count = 0
+        self.m_generation += 1
+
+    def load_state(self, nodes, head_slot, length, free, free_index):
+        '''
+        replace the snake with the state of another ring buffer and free pool with the same layout,
+        e.g. a game of batch_snake.run_batch_test, so the game can continue with the same free pool order
+
+        Parameters
+        ----------
+        nodes : array
+            ring buffer of node ids, its length must be the capacity of the snake
+
+        head_slot : integer
+            position of the head in the ring buffer
+
+        length : integer
+            length of the snake
+
+        free : array
+            free pool, the first capacity - length nodes are free
+
+        free_index : array
+            position of every node in the free pool
+
+        Raises
+        ------
+        ValueError
+            if the arrays don't match the capacity of the snake
+        '''
+        capacity = len(self.m_nodes)
+        if len(nodes) != capacity or len(free) != capacity or len(free_index) != capacity:
+            raise ValueError(f'failed to load snake state! the arrays must have length {capacity}')
+        self.m_nodes[:] = nodes
+        self.m_free[:] = free
+        self.m_free_index[:] = free_index
+        self.m_head = int(head_slot)
+        self.m_length = int(length)
+        self.m_occupied[:] = False
+        self.m_occupied[self.to_array()] = True
+        self.m_push_count = 0
+        self.m_generation += 1
+
+    def is_occupied(self, node):
+        '''
+        query whether the snake occupies the specified node
+
+        Parameters
+        ----------
+        node : integer
+            node id to be queried
+
+        Returns
+        -------
+        bool
+            true, if the node is part of the snake
+        '''
+        return 0 <= node < len(self.m_occupied) and bool(self.m_occupied[node])
+
+    def free_count(self):
+        '''
+        Returns
+        -------
+        integer
+            number of nodes, which aren't occupied by the snake
+        '''
+        return len(self.m_free) - self.m_length
+
+    def free_node(self, index):
+        '''
+        retrieve a node from the pool of free nodes
+
+        Parameters
+        ----------
+        index : integer
+            index in the free pool, must be less than free_count()
+
+        Returns
+        -------
+        integer
+            node id of the free node
+        '''
+        return self.m_free[index]
+
+    def occupancy(self):
+        '''
+        Returns
+        -------
+        array
+            read-only boolean grid, where the indices are node ids and the values
+            tell whether the node is occupied by the snake
+        '''
+        occupied = self.m_occupied.view()
+        occupied.flags.writeable = False
+        return occupied
+
+    def to_array(self):
+        '''
+        Returns
+        -------
+        array
+            a copy of the node ids the snake occupies, starting from the head
+        '''
+        capacity = len(self.m_nodes)
+        end = self.m_head + self.m_length
+        if end <= capacity:
+            return self.m_nodes[self.m_head:end].copy()
+        return np.concatenate((self.m_nodes[self.m_head:], self.m_nodes[:end - capacity]))
+
+    def __len__(self):
+        return self.m_length
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.m_length
+        if index < 0 or index >= self.m_length:
+            raise IndexError(f'index {index} is out of the bounds of the snake with length {self.m_length}')
+        return self.m_nodes[(self.m_head + index) % len(self.m_nodes)]
+
+    def __iter__(self):
+        return iter(self.to_array())
+
+    def __contains__(self, node):
+        return self.is_occupied(node)
+
+    def __array__(self, dtype=None, copy=None):
+        nodes = self.to_array()
+        return nodes if dtype is None else nodes.astype(dtype)
+
+
+def create_empty_snake(capacity=0):
     '''
     create empty snake body
 
+    Parameters
+    ----------
+    capacity : integer, optional
+        maximum length of the snake, by default is 0
+
     Returns
     -------
-    array
-        the empty snake array
+    SnakeBody
+        the empty snake body
     '''
-    return np.empty(shape=0, dtype=np.int64)
+    return SnakeBody(capacity)
+
+
+@lru_cache(maxsize=4096)
+def get_food_index(seed, free_count):
+    '''
+    retrieve the index of the free node, picked by create_food.
+    The rng is seeded again for every food, so the index only depends on the seed
+    and the number of free nodes. The cache holds the most recent pairs, which covers
+    a game on a large board, while a long session of many seeds doesn't grow without bound
+
+    Parameters
+    ----------
+    seed : integer
+        used to seed the default rng
+
+    free_count : integer
+        number of free nodes on the board
+
+    Returns
+    -------
+    integer
+        index in the sorted array of free node ids
+    '''
+    seed_seq = np.random.SeedSequence(entropy=seed)
+    rng = np.random.default_rng(seed_seq)
+    return rng.integers(free_count)
 
 
 def create_food(snake, all_nodes, seed):
     '''
-    create a food on the board
+    create a food on the board. Compatibility mode, which reproduces the
+    food sequence of the saved simulations. Use spawn_food for new games.
 
     Parameters
     ----------
 
-    snake : array
+    snake : SnakeBody
         contains all node ids the snake occupies on the board
 
     all_nodes : array
@@ -49,25 +457,46 @@ def create_food(snake, all_nodes, seed):
     integer
         a node id of the newly created food
     '''
-    free = np.setdiff1d(all_nodes, snake)
+    free = all_nodes[~snake.occupancy()[all_nodes]]
     if (len(free) == 0):
         return -1
-    seed_seq = np.random.SeedSequence(entropy=seed)
-    rng = np.random.default_rng(seed_seq)
-    return rng.choice(free)
+    return free[get_food_index(seed, len(free))]
+
+
+def spawn_food(snake, rng):
+    '''
+    spawn a food on a random free node
+
+    Parameters
+    ----------
+    snake : SnakeBody
+        contains all node ids the snake occupies on the board
+
+    rng : Generator
+        random generator of the game
+
+    Returns
+    -------
+    integer
+        a node id of the newly created food. -1 if there are no free nodes
+    '''
+    free_count = snake.free_count()
+    if free_count == 0:
+        return -1
+    return snake.free_node(rng.integers(free_count))
 
 
-def move(snake, dir: Dir, food, all_nodes, seed, node_shape):
+def move(snake, dir, food, all_nodes, seed, node_shape, rng=None):
     '''
     move the snake and check for collisions
 
     Parameters
     ----------
-    snake - array
-        snake to be moved, contains node ids it occupies on the board
+    snake - SnakeBody
+        snake to be moved in place, contains node ids it occupies on the board
 
-    dir : Dir
-        direction to move snake next
+    dir : Dir or integer
+        direction or direction code to move snake next
 
     food : integer
         node id of the food
@@ -81,6 +510,10 @@ def move(snake, dir: Dir, food, all_nodes, seed, node_shape):
     seed : integer
         used to seed the default rng
 
+    rng : Generator, optional
+        random generator of the game, used to spawn the next food, by default is None.
+        If None, the food is created by create_food from seed
+
     Returns
     -------
     Tuple
@@ -89,31 +522,87 @@ def move(snake, dir: Dir, food, all_nodes, seed, node_shape):
     Raises
     ------
     TypeError
-        if dir isn't of type Dir
+        if dir isn't a Dir or a direction code
     '''
-    if not isinstance(dir, Dir):
-        raise TypeError(f'dir: {dir} isn\'t of type Dir')
-    new_head = nav.get_next_node_id(snake[0], dir, node_shape)
-    if new_head is None:  # if the head is out of the bounds of the shape
+    new_head = nav.get_topology(node_shape).get_neighbor(snake.head(), dir)
+    if new_head == nav.WALL:  # if the head is out of the bounds of the shape
         status = SnakeStatus.LOST
     else:  # if the head is inside shape
         status = SnakeStatus.MOVING
         if new_head == food:
-            snake = np.append([food], snake)
-            food = create_food(snake, all_nodes, seed)
+            snake.push_head(food)
+            food = create_food(snake, all_nodes, seed) if rng is None else spawn_food(snake, rng)
             status = SnakeStatus.WON if food == -1 else SnakeStatus.ATE_FOOD
-        elif new_head in snake:
-            snake = create_empty_snake()
+        elif snake.is_occupied(new_head):
+            snake.clear()
             status = SnakeStatus.LOST
         else:
-            snake = np.roll(snake, 1)
-            snake[0] = new_head
+            snake.pop_tail()
+            snake.push_head(new_head)
 
     return snake, food, status
 
 
-def run_test(node_shape, algo, seed):
+def run_follow_path(snake, food, path_tables, all_nodes, seed, node_shape, rng=None, all_moves=None, curr_move=0):
     '''
+    run a game with Algo.FOLLOW_PATH, jumping straight from meal to meal.
+    The body of the snake is always the part of the cycle right behind its head,
+    so the nodes up to the next food are free and the snake never loses.
+    The result is the same as moving the snake one node at a time.
+
+    Parameters
+    ----------
+    snake : SnakeBody
+        snake at the start of the game
+
+    food : integer
+        node id of the first food
+
+    path_tables : PathTables
+        lookup tables of the hamiltonian cycle the snake follows
+
+    all_nodes : array
+        all node ids on the board
+
+    seed : integer
+        used to seed the default rng
+
+    node_shape : array
+        node shape HxW - number of nodes in the height and width dimensions
+
+    rng : Generator, optional
+        random generator of the game, used to spawn the next food, by default is None.
+        If None, the food is created by create_food from seed
+
+    all_moves : array, optional
+        the moves of the game so far, which are updated in place, by default is None, which starts a new array
+
+    curr_move : integer, optional
+        index of the food, which the snake is heading to, by default is 0
+
+    Returns
+    -------
+    all_moves : array
+        the same as the one of run_test
+    '''
+    size = len(all_nodes)
+    orders = path_tables.m_orders
+    if all_moves is None:
+        all_moves = np.zeros(shape=size - 1, dtype=np.int64)
+    while food != -1:
+        head_order = orders[snake.head()]
+        food_dist = nav.path_distance(head_order, orders[food], node_shape)
+        snake.advance(path_tables.m_nodes[(head_order + 1 + np.arange(food_dist)) % size])
+        snake.push_head(food)
+        food = create_food(snake, all_nodes, seed) if rng is None else spawn_food(snake, rng)
+        all_moves[curr_move] += food_dist + 1
+        curr_move += 1
+    return all_moves
+
+
+def run_test(node_shape, algo, seed, is_legacy_food=False, mst_algo=MstAlgo.PRIM, is_fast_forward=True):
+    '''
+    run a single game with the specified algorithm
 
     Parameters
     ----------
@@ -126,6 +615,18 @@ def run_test(node_shape, algo, seed):
     seed : integer
         rng seed for reproducibility
 
+    is_legacy_food : bool, optional
+        whether to create the food with create_food, which reproduces the saved simulations,
+        by default is False, which spawns the food from the rng of the game
+
+    mst_algo : MstAlgo, optional
+        spanning tree algorithm, which guides the hamiltonian path, by default is MstAlgo.PRIM
+
+    is_fast_forward : bool, optional
+        whether Algo.FOLLOW_PATH jumps from meal to meal with run_follow_path and Algo.TAKE_SHORTCUTS
+        skips the moves, in which it only follows the path, by default is True.
+        Otherwise, every move is simulated
+
     Returns
     -------
     all_moves : array
@@ -133,27 +634,94 @@ def run_test(node_shape, algo, seed):
         for the snake to eat the particular piece of food
     '''
     node_shape = nav.create_pos(node_shape[Dmn.H], node_shape[Dmn.W])
-    hamilton = hcg.generate_path(node_shape, seed)
+    path_tables = hcg.get_path_tables(node_shape, seed, mst_algo)
     all_nodes = np.arange(node_shape[Dmn.W] * node_shape[Dmn.H])
     seed_seq = np.random.SeedSequence(entropy=seed)
     rng = np.random.default_rng(seed_seq)
-    snake = rng.integers(len(all_nodes), size=1, dtype=int)
-    food = create_food(snake, all_nodes, seed)
-    move_algo.set_path_dir_index(snake[0], hamilton)
+    snake = SnakeBody(len(all_nodes), rng.integers(len(all_nodes), size=1, dtype=int))
+    if is_legacy_food:
+        food = create_food(snake, all_nodes, seed)
+        rng = None
+    else:
+        food = spawn_food(snake, rng)
+    all_moves = np.zeros(shape=len(all_nodes) - 1, dtype=np.int64)
+    return play_game(snake, food, algo, path_tables, all_nodes, seed, node_shape, rng,
+                     all_moves, is_fast_forward=is_fast_forward)
+
+
+def play_game(snake, food, algo, path_tables, all_nodes, seed, node_shape, rng, all_moves, curr_move=0,
+              is_fast_forward=True):
+    '''
+    play a game from its current state until the snake wins or loses.
+    It's used by run_test and to finish the games of batch_snake.run_batch_test
+
+    Parameters
+    ----------
+    snake : SnakeBody
+        current snake
+
+    food : integer
+        node id of the current food
+
+    algo : Algo
+        algorithm to be tested
+
+    path_tables : PathTables
+        lookup tables of the hamiltonian cycle of the game
+
+    all_nodes : array
+        all node ids on the board
+
+    seed : integer
+        rng seed of the game
+
+    node_shape : array
+        node shape HxW - number of nodes in the height and width dimensions
+
+    rng : Generator
+        random generator of the game, used to spawn the food. If None, the food is created by create_food from seed
+
+    all_moves : array
+        the moves of the game so far, as returned by run_test. It's updated in place
+
+    curr_move : integer, optional
+        index of the food, which the snake is heading to, by default is 0
+
+    is_fast_forward : bool, optional
+        the same as the one of run_test, by default is True
+
+    Returns
+    -------
+    all_moves : array
+        the moves of the game
+    '''
+    if algo is Algo.FOLLOW_PATH and is_fast_forward:
+        return run_follow_path(snake, food, path_tables, all_nodes, seed, node_shape, rng, all_moves, curr_move)
+    hamilton = path_tables.m_orders
+    # The planner holds the state of the algorithm, so games don't share any state
+    planner = move_algo.create_planner(algo, path_tables, node_shape)
+    if planner is not None:
+        planner.reset(snake.head())
     status = SnakeStatus.MOVING
+    is_following = True
 
-    all_moves = np.zeros(shape=len(all_nodes) - 1, dtype=np.int64)
-    curr_move = 0
     while status not in [SnakeStatus.WON, SnakeStatus.LOST]:
-        dir = None
-        if (algo is Algo.FOLLOW_PATH):
-            dir = move_algo.find_next_dir(hamilton, node_shape)
-        elif algo is Algo.TAKE_SHORTCUTS:
-            dir = move_algo.find_next_shortcut_dir(snake, food, hamilton, node_shape)
+        if algo is Algo.TAKE_SHORTCUTS and is_fast_forward and is_following:
+            # Skip to the next decision point, while the snake only follows the path
+            follow_count = planner.count_follow_path_moves(snake, food)
+            if follow_count > 0:
+                head_order = hamilton[snake.head()]
+                snake.advance(path_tables.m_nodes[(head_order + 1 + np.arange(follow_count)) % len(all_nodes)])
+                all_moves[curr_move] += follow_count
+                continue
+        dir = None if planner is None else planner.next_dir(snake, food)
 
         if dir is None:
             break
-        snake, food, status = move(snake, dir, food, all_nodes, seed, node_shape)
+        head_order = hamilton[snake.head()]
+        snake, food, status = move(snake, dir, food, all_nodes, seed, node_shape, rng)
+        # Shortcuts are rarely skipped right after one was taken, so only look for a stretch after a path move
+        is_following = status == SnakeStatus.MOVING and hamilton[snake.head()] == (head_order + 1) % len(all_nodes)
 
         all_moves[curr_move] += 1
         if status == SnakeStatus.ATE_FOOD:
@@ -161,7 +729,218 @@ def run_test(node_shape, algo, seed):
     return all_moves
 
 
-def run_simulation(sim_params, save_path):
+def run_test_job(job):
+    '''
+    run a single simulation job. Used as a worker function of run_simulation
+
+    Parameters
+    ----------
+    job : tuple
+        (moves_key, node_shape, algo, seed, is_legacy_food, mst_algo) tuple, where moves_key is the key of the
+        result in the simulation data and the rest are the arguments of run_test
+
+    Returns
+    -------
+    list
+        a list with a single (moves_key, moves) tuple, where moves is the list returned by run_test
+    '''
+    moves_key, node_shape, algo, seed, is_legacy_food, mst_algo = job
+    moves = run_test(node_shape, algo, seed, is_legacy_food, mst_algo)
+    return [(moves_key, moves.tolist())]
+
+
+def run_batch_job(job):
+    '''
+    run a batch of games in lockstep. Used as a worker function of run_simulation
+
+    Parameters
+    ----------
+    job : tuple
+        (moves_keys, node_shape, algo, seeds, is_legacy_food, mst_algo) tuple, where moves_keys are the keys of the
+        results in the simulation data and the rest are the arguments of batch_snake.run_batch_test
+
+    Returns
+    -------
+    list
+        a list of (moves_key, moves) tuples, one for each game in the batch
+    '''
+    moves_keys, node_shape, algo, seeds, is_legacy_food, mst_algo = job
+    all_moves = batch_snake.run_batch_test(node_shape, algo, seeds, is_legacy_food, mst_algo)
+    return [(moves_key, moves.tolist()) for moves_key, moves in zip(moves_keys, all_moves)]
+
+
+def create_simulation_jobs(sim_params):
+    '''
+    create the list of simulation jobs for the specified parameters
+
+    Parameters
+    ----------
+    sim_params : dict
+        contains the configuration parameters for the simulation
+
+    Returns
+    -------
+    jobs : list
+        a list of (moves_key, node_shape, algo, seed, is_legacy_food, mst_algo) tuples in the order in which
+        the results are stored
+    '''
+    is_legacy_food = sim_params.get("is_legacy_food", False)
+    mst_algo = MstAlgo(sim_params.get("mst_algo", MstAlgo.PRIM))
+    jobs = []
+    for seed in sim_params["seeds"]:
+        for shape in sim_params["node_shapes"]:
+            for game in range(sim_params["games_per_seed"]):
+                for algo in [Algo.FOLLOW_PATH, Algo.TAKE_SHORTCUTS]:
+                    moves_key = sim_io.create_moves_key(shape, seed, algo, game)
+                    jobs.append((moves_key, shape, algo, seed, is_legacy_food, mst_algo))
+    return jobs
+
+
+def get_job_content_key(job):
+    '''
+    retrieve the inputs, which fully determine the result of a simulation job.
+    Jobs with the same content key produce the same moves
+
+    Parameters
+    ----------
+    job : tuple
+        (moves_key, node_shape, algo, seed, is_legacy_food, mst_algo) tuple from create_simulation_jobs
+
+    Returns
+    -------
+    tuple
+        (h, w, algo, seed, is_legacy_food, mst_algo) tuple
+    '''
+    _, shape, algo, seed, is_legacy_food, mst_algo = job
+    return (int(shape[Dmn.H]), int(shape[Dmn.W]), int(algo), int(seed), bool(is_legacy_food), int(mst_algo))
+
+
+def create_batch_jobs(jobs, batch_size=None):
+    '''
+    group simulation jobs with the same shape and algorithm into batches
+
+    Parameters
+    ----------
+    jobs : list
+        a list of (moves_key, node_shape, algo, seed, is_legacy_food, mst_algo) tuples from create_simulation_jobs
+
+    batch_size : integer, optional
+        maximum number of games in a batch, by default is None, which means no limit
+
+    Returns
+    -------
+    batch_jobs : list
+        a list of (moves_keys, node_shape, algo, seeds, is_legacy_food, mst_algo) tuples
+    '''
+    groups = {}
+    for moves_key, shape, algo, seed, is_legacy_food, mst_algo in jobs:
+        group = groups.setdefault((tuple(shape), algo, is_legacy_food, mst_algo), ([], []))
+        group[0].append(moves_key)
+        group[1].append(seed)
+
+    batch_jobs = []
+    for (shape, algo, is_legacy_food, mst_algo), (moves_keys, seeds) in groups.items():
+        step = len(seeds) if batch_size is None else batch_size
+        for i in range(0, len(seeds), step):
+            batch_jobs.append((moves_keys[i:i + step], list(shape), algo, seeds[i:i + step], is_legacy_food, mst_algo))
+    return batch_jobs
+
+
+def run_simulation_jobs(jobs, worker_count=1, batch_size=1):
+    '''
+    generator function, which runs the simulation jobs and yields the result of every game
+    as soon as it's available
+
+    Parameters
+    ----------
+    jobs : list
+        a list of (moves_key, node_shape, algo, seed, is_legacy_food, mst_algo) tuples from create_simulation_jobs
+
+    worker_count : integer, optional
+        number of worker processes the games are distributed to, by default is 1.
+        1 runs the games serially in the current process, None uses all available cores
+
+    batch_size : integer, optional
+        maximum number of games advanced in lockstep by batch_snake.run_batch_test, by default is 1.
+        1 runs every game separately with run_test, None batches all games with the same shape and algorithm
+
+    Returns
+    -------
+    (moves_key, moves) : tuple
+        the key of the game and the list of moves the snake made
+    '''
+    run_job = run_test_job
+    scheduled_jobs = jobs
+    if batch_size != 1:
+        run_job = run_batch_job
+        scheduled_jobs = create_batch_jobs(jobs, batch_size)
+
+    if worker_count == 1:
+        for job in scheduled_jobs:
+            yield from run_job(job)
+    else:
+        if worker_count is None:
+            worker_count = os.cpu_count()
+        # Hand out several jobs per task to reduce the inter-process overhead
+        chunk_size = max(1, len(scheduled_jobs) // (worker_count * 4))
+        # Spawned workers start with the default path cache, so give them the settings of this process
+        with ProcessPoolExecutor(max_workers=worker_count, initializer=hcg.configure_path_cache,
+                                 initargs=hcg.path_cache.get_settings()) as executor:
+            for job_results in executor.map(run_job, scheduled_jobs, chunksize=chunk_size):
+                yield from job_results
+
+
+def write_copies(writer, copy_keys, moves, finished=None):
+    '''
+    write the moves of a game for every copy of it
+
+    Parameters
+    ----------
+    writer : SimulationWriter
+        the writer of the simulation
+
+    copy_keys : list
+        keys of the games, which have the same moves
+
+    moves : list
+        the moves of the game
+
+    finished : dict, optional
+        the finished games, to which the copies are added, by default is None
+    '''
+    for copy_key in copy_keys:
+        print(f'test {copy_key}')
+        writer.write(copy_key, moves)
+        if finished is not None:
+            finished[copy_key] = moves
+
+
+def move_aside(path):
+    '''
+    rename a file, so it isn't overwritten. The extension is kept, so the file can still be read
+
+    Parameters
+    ----------
+    path : string
+        path of the file
+
+    Returns
+    -------
+    string
+        the new path of the file, which doesn't exist yet
+    '''
+    base, extension = os.path.splitext(path)
+    if path.endswith(sim_io.CHECKPOINT_EXTENSION):
+        base, extension = path[:-len(sim_io.CHECKPOINT_EXTENSION)], sim_io.CHECKPOINT_EXTENSION
+    index = 1
+    while os.path.exists(f'{base}.old{index}{extension}'):
+        index += 1
+    new_path = f'{base}.old{index}{extension}'
+    os.replace(path, new_path)
+    return new_path
+
+
+def run_simulation(sim_params, save_path, worker_count=1, batch_size=1, is_resume=False, checkpoint_every=100):
     '''
     run a simulation from the specified parameters and save the results.
     Parameters
@@ -170,30 +949,111 @@ def run_simulation(sim_params, save_path):
         contains the configuration parameters for the simulation
 
     save_path : string
-        path of the json where the results will be saved.
+        path of the file where the results will be saved.
+        A .jsonl path streams every finished game to disk, so the memory usage
+        doesn't grow with the simulation. A .sim path is saved as a binary simulation file
+        and any other path as a single json, once all games are finished.
+        Until then their games are streamed to a checkpoint next to save_path.
+        All of them are read by sim_io.read_simulation
+
+    worker_count : integer, optional
+        number of worker processes the games are distributed to, by default is 1.
+        1 runs the games serially in the current process, None uses all available cores
+
+    batch_size : integer, optional
+        maximum number of games advanced in lockstep by batch_snake.run_batch_test, by default is 1.
+        1 runs every game separately with run_test, None batches all games with the same shape and algorithm
+
+    is_resume : bool, optional
+        whether to resume an interrupted simulation, by default is False.
+        The games, already found in save_path or its checkpoint, aren't run again.
+        If they were run with different parameters, the files are moved aside
+        with move_aside and a new simulation is started
+
+    checkpoint_every : integer, optional
+        number of finished games after which the results are synced to disk, by default is 100
     '''
     seed_count = sim_params["seed_count"]
-    games_per_seed = sim_params["games_per_seed"]
-    shapes = sim_params["node_shapes"]
 
     seeds = np.arange(seed_count)
     results = {}
     results["params"] = sim_params
     results["params"]["seeds"] = seeds.tolist()
+    results["params"]["is_legacy_food"] = sim_params.get("is_legacy_food", False)
+    results["params"]["mst_algo"] = int(sim_params.get("mst_algo", MstAlgo.PRIM))
     results["data"] = {}
-    for seed in seeds:
-        for shape in shapes:
-            data_key = f''
-            total_size = shape[Dmn.H] * shape[Dmn.W]
-            for game in range(games_per_seed):
-                algos = [Algo.FOLLOW_PATH, Algo.TAKE_SHORTCUTS]
-                for algo in algos:
-                    moves_key = f'shape_{shape[Dmn.H]}x{shape[Dmn.W]}_seed_{seed}_algo_{algo}_game_{game}'
-                    print(f'test {moves_key}')
-                    moves = run_test(shape, algo, seed)
-                    results["data"][moves_key] = moves.tolist()
-
-    # Save results to json file
-    json_object = json.dumps(results, indent=4)
-    with open(save_path, "w") as outfile:
-        outfile.write(json_object)
+
+    extension = os.path.splitext(save_path)[1]
+    is_streaming = extension == sim_io.JSONL_EXTENSION
+    stream_path = save_path if is_streaming else save_path + sim_io.CHECKPOINT_EXTENSION
+
+    # Find the games, which were finished before the simulation was interrupted.
+    # The moves of a streamed simulation are already on disk, so only their keys are kept
+    is_started = False
+    finished = {}
+    if is_resume:
+        try:
+            if not is_streaming and os.path.exists(save_path):
+                finished.update(sim_io.read_finished_games(save_path, results["params"])[1])
+            if os.path.exists(stream_path):
+                is_started, checkpoint = sim_io.read_finished_games(stream_path, results["params"], not is_streaming)
+                finished.update(checkpoint)
+        except ValueError as error:
+            print(error)
+            for old_path in [save_path, stream_path]:
+                if os.path.exists(old_path):
+                    print(f'starting a new simulation, the old results are moved to {move_aside(old_path)}')
+            is_started = False
+            finished = {}
+
+    jobs = create_simulation_jobs(results["params"])
+    missing_jobs = [job for job in jobs if job[0] not in finished]
+    if len(finished) > 0:
+        print(f'resume simulation: {len(jobs) - len(missing_jobs)} of {len(jobs)} games are already finished')
+
+    # The games are deterministic, so every distinct game is run once and its moves
+    # are shared by all of its copies. The finished games serve as a cache as well.
+    content_keys = {job[0]: get_job_content_key(job) for job in jobs}
+    copies = {}
+    for job in missing_jobs:
+        copies.setdefault(content_keys[job[0]], []).append(job[0])
+    # Only the keys of the streamed games were kept, so read back the moves of those,
+    # which still have missing copies
+    streamed_keys = {moves_key for moves_key, moves in finished.items()
+                     if moves is None and content_keys.get(moves_key) in copies}
+    streamed = sim_io.read_games(stream_path, streamed_keys) if len(streamed_keys) > 0 else {}
+    cache = {}
+    for moves_key, moves in finished.items():
+        moves = streamed.get(moves_key, moves)
+        if moves is not None and moves_key in content_keys:
+            cache[content_keys[moves_key]] = moves
+    unique_jobs = [job for job in missing_jobs
+                   if content_keys[job[0]] not in cache and copies[content_keys[job[0]]][0] == job[0]]
+    cached_count = len(missing_jobs) - len(unique_jobs)
+
+    # The moves of a streamed simulation are on disk, so they aren't kept in finished
+    kept = None if is_streaming else finished
+    with sim_io.SimulationWriter(stream_path, results["params"], is_started, checkpoint_every) as writer:
+        for content_key, moves in cache.items():
+            if content_key in copies:
+                write_copies(writer, copies[content_key], moves, kept)
+        for moves_key, moves in run_simulation_jobs(unique_jobs, worker_count, batch_size):
+            write_copies(writer, copies[content_keys[moves_key]], moves, kept)
+
+    print(f'simulation finished: {cached_count} of {len(missing_jobs)} games were served from the cache')
+
+    if is_streaming:
+        return
+
+    # Keep the order of the results independent of how the jobs were scheduled
+    for job in jobs:
+        results["data"][job[0]] = finished[job[0]]
+
+    if extension == sim_io.BINARY_EXTENSION:
+        sim_io.write_binary(results, save_path)
+    else:
+        # Save results to json file
+        json_object = json.dumps(results, indent=4)
+        with open(save_path, "w") as outfile:
+            outfile.write(json_object)
+    os.remove(stream_path)